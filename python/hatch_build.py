@@ -0,0 +1,55 @@
+"""Build hook compiling the optional ``_match`` C extension.
+
+The extension is built when Cython (>= 3.0), setuptools and a C compiler
+are available in the build environment and ``AGENT_POLICY_GUARD_PURE_PYTHON``
+is not set.  None of them is a build requirement, so an isolated build
+(plain ``pip install``) yields a pure-Python wheel; install them first and
+build with ``--no-build-isolation`` to get the extension.  Any failure
+likewise leaves a pure-Python wheel: the engine does not require it.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+from hatchling.builders.hooks.plugin.interface import BuildHookInterface
+
+_SOURCE = "src/agent_policy_guard/_match.pyx"
+
+
+class CustomBuildHook(BuildHookInterface):
+    def initialize(self, version: str, build_data: dict[str, Any]) -> None:
+        if self.target_name != "wheel" or os.environ.get("AGENT_POLICY_GUARD_PURE_PYTHON"):
+            return
+        try:
+            from Cython.Build import cythonize
+            from setuptools import Distribution, Extension
+        except ImportError:
+            return
+        root = Path(self.root)
+        try:
+            extensions = cythonize(
+                [Extension("agent_policy_guard._match", [str(root / _SOURCE)])],
+                quiet=True,
+            )
+            dist = Distribution(
+                {"ext_modules": extensions, "package_dir": {"": str(root / "src")}}
+            )
+            cmd = dist.get_command_obj("build_ext")
+            cmd.inplace = True
+            cmd.ensure_finalized()
+            cmd.run()
+            built = Path(cmd.get_ext_fullpath("agent_policy_guard._match"))
+        except Exception as exc:
+            print(f"agent-policy-guard: not building C extension ({exc})", file=sys.stderr)
+            return
+        build_data["pure_python"] = False
+        build_data["infer_tag"] = True
+        # Editable installs import the module in place from src/.  Regular
+        # wheels must list it: built files are git-ignored, so hatch would
+        # not pick them up itself.
+        if version != "editable":
+            build_data["force_include"][str(built)] = f"agent_policy_guard/{built.name}"
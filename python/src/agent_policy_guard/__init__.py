@@ -14,6 +14,7 @@ from .models import (
     EvalContext,
     Metadata,
     Policy,
+    PolicyMatches,
     PolicySet,
     Verdict,
 )
@@ -27,6 +28,7 @@ __all__ = [
     "Metadata",
     "Policy",
     "PolicyEngine",
+    "PolicyMatches",
     "PolicySet",
     "Verdict",
     "load_policy_set",
@@ -0,0 +1,116 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""Compiled condition matchers and scan loop (optional C extension).
+
+Built from this file when Cython is available at install time; the
+engine falls back to its generated Python matchers otherwise.
+"""
+
+
+cdef class _Field:
+    """One compiled condition field (a ``CompiledPatterns``), typed."""
+
+    cdef str ctx_attr
+    cdef bint is_mode
+    cdef bint match_all
+    cdef bint match_empty
+    cdef frozenset literals
+    cdef tuple globs
+
+    def __init__(self, str ctx_attr, compiled, bint required):
+        self.ctx_attr = ctx_attr
+        self.is_mode = ctx_attr == "mode"
+        self.match_all = compiled.match_all
+        self.literals = compiled.literals
+        self.globs = compiled.globs
+        # An unset mcp_server never matches an mcp_servers condition.
+        self.match_empty = not required and compiled("")
+
+    cdef bint matches(self, object value) except -1:
+        # *value* is typed as object, not str: str subclasses such as
+        # str-valued enums (Channel) are valid context values.
+        if not value:
+            # Unset context value: decided once, in __init__.
+            return self.match_empty
+        if self.match_all or value in self.literals:
+            return True
+        for glob in self.globs:
+            if glob(value):
+                return True
+        return False
+
+
+cdef class CompiledCondition:
+    """A compiled condition lowered to typed per-field checks.
+
+    Built from the same ``{field: CompiledPatterns}`` mapping as the
+    generated matcher functions in :mod:`agent_policy_guard.engine`, and
+    equivalent to them: ``matches(ctx, mode)`` tests the fields in
+    *order*, with *mode* standing in for ``ctx.mode``.
+    """
+
+    cdef tuple _fields
+
+    def __init__(self, matchers, order):
+        fields = []
+        for cond_attr, ctx_attr in order:
+            compiled = matchers[cond_attr]
+            required = cond_attr == "mcp_servers"
+            if compiled.match_all and not required:
+                continue
+            fields.append(_Field(ctx_attr, compiled, required))
+        self._fields = tuple(fields)
+
+    cpdef bint matches(self, object ctx, object mode) except -1:
+        cdef _Field field
+        cdef object value
+        for field in self._fields:
+            value = mode if field.is_mode else getattr(ctx, field.ctx_attr)
+            if not field.matches(value):
+                return False
+        return True
+
+    def __call__(self, ctx, mode):
+        return self.matches(ctx, mode)
+
+
+cdef class Scanner:
+    """The compiled conditions of a loaded policy list.
+
+    ``first_match(mask, ctx, mode)`` returns the lowest position set in
+    the candidate bitmask *mask* whose condition matches, or -1.  The
+    mask is decoded a byte at a time and conditions are called through
+    their C entry point, with no Python-level work per candidate.
+    """
+
+    cdef list _conditions
+
+    def __init__(self, conditions):
+        conditions = list(conditions)
+        for condition in conditions:
+            if not isinstance(condition, CompiledCondition):
+                raise TypeError(f"expected CompiledCondition, got {type(condition).__name__}")
+        self._conditions = conditions
+
+    cpdef Py_ssize_t first_match(self, object mask, object ctx, object mode) except -2:
+        cdef bytes data
+        cdef const unsigned char *buf
+        cdef Py_ssize_t i, bit, pos
+        cdef Py_ssize_t size = len(self._conditions)
+        cdef unsigned char byte
+        if mask <= 0:
+            return -1
+        data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+        buf = data
+        for i in range(len(data)):
+            byte = buf[i]
+            bit = 0
+            while byte:
+                if byte & 1:
+                    pos = i * 8 + bit
+                    if pos >= size:
+                        return -1
+                    if (<CompiledCondition>self._conditions[pos]).matches(ctx, mode):
+                        return pos
+                byte >>= 1
+                bit += 1
+        return -1
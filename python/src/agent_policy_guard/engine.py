@@ -2,118 +2,495 @@
 
 from __future__ import annotations
 
+import functools
 import logging
-from dataclasses import replace
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from operator import attrgetter
+from types import CodeType, FunctionType
 from typing import Any
 
-from .match import list_matches
+from .index import PolicyIndex
+from .match import CompiledPatterns, compile_patterns, has_magic
 from .models import (
+    _CONDITION_FIELDS,
+    _CONTEXT_ATTRS,
     Condition,
     Defaults,
     EvalContext,
     Policy,
+    PolicyMatches,
     PolicySet,
     Verdict,
 )
+from .optimize import optimize_policies
+
+try:
+    from ._match import CompiledCondition, Scanner
+except ImportError:  # C extension not built; use the generated Python matchers
+    CompiledCondition = None
+    Scanner = None
 
 logger = logging.getLogger(__name__)
 
 
-def _condition_matches(cond: Condition, ctx: EvalContext) -> bool:
+# (condition field, context attribute) pairs in the default check order:
+# tools and modes are the most specific in practice and reject fastest,
+# while users and sessions -- last in any case -- are rarely set.
+_FIELD_PAIRS: tuple[tuple[str, str], ...] = tuple(
+    sorted(_CONTEXT_ATTRS.items(), key=lambda f: f[0] not in ("tools", "modes"))
+)
+
+
+def _compile_condition(cond: Condition) -> dict[str, CompiledPatterns]:
+    """Compile *cond*'s patterns, once per load.
+
+    Maps each set field's name to its matcher (see
+    :func:`~agent_policy_guard.match.compile_patterns`), cheapest check
+    first so most misses never reach a glob.  Everything that tests a
+    condition -- :func:`_condition_matches`, the generated matchers and
+    the C extension -- works from this mapping, so they all see the
+    pattern lists as they were when the policy set was loaded.
+    """
+    compiled = {
+        cond_attr: matcher
+        for cond_attr in _CONDITION_FIELDS
+        if (matcher := compile_patterns(getattr(cond, cond_attr))) is not None
+    }
+    return dict(sorted(compiled.items(), key=lambda item: item[1].cost))
+
+
+def _condition_matches(matchers: dict[str, CompiledPatterns], ctx: EvalContext) -> bool:
     """Return True when every specified condition field matches the context.
 
+    *matchers* is a condition compiled by :func:`_compile_condition`.
     Fields set to ``None`` are ignored (wildcard).  Non-None fields
     require at least one pattern in the list to match the corresponding
     context value.
     """
-    if not list_matches(cond.modes, ctx.mode):
-        return False
-    if not list_matches(cond.models, ctx.model):
-        return False
-    if not list_matches(cond.channels, ctx.channel):
-        return False
-    if not list_matches(cond.tools, ctx.tool):
-        return False
-    if not list_matches(cond.risk, ctx.risk):
-        return False
-    if not list_matches(cond.users, ctx.user):
-        return False
-    if not list_matches(cond.sessions, ctx.session):
-        return False
-
-    # mcp_servers: if patterns are specified but no mcp_server in context -> no match
-    if cond.mcp_servers is not None:
-        if not ctx.mcp_server:
+    for name, matcher in matchers.items():
+        value = getattr(ctx, _CONTEXT_ATTRS[name])
+        # mcp_servers: if patterns are specified but no mcp_server in context -> no match
+        if name == "mcp_servers" and not value:
             return False
-        if not list_matches(cond.mcp_servers, ctx.mcp_server):
+        if not matcher(value):
             return False
-
     return True
 
 
+def _field_order(policies: Sequence[Policy]) -> list[tuple[str, str]]:
+    """Order condition fields from most to least selective for *policies*.
+
+    A field with many distinct patterns across the set splits it finely,
+    so any given context value matches few of them -- checking it first
+    rejects most policies in one comparison.  Ties keep the default order.
+    """
+    distinct = {
+        cond_attr: len(
+            {
+                pattern
+                for policy in policies
+                for pattern in getattr(policy.condition, cond_attr) or ()
+            }
+        )
+        for cond_attr in _CONDITION_FIELDS
+    }
+    return sorted(_FIELD_PAIRS, key=lambda f: -distinct[f[0]])
+
+
+def _literal_modes(policies: Sequence[Policy]) -> frozenset[str] | None:
+    """Return every mode *policies* can match, or None if that is unbounded.
+
+    The set is only finite when each policy lists literal ``modes``; a
+    policy without a ``modes`` condition, or with a glob in it, can match
+    any mode.
+    """
+    modes: set[str] = set()
+    for policy in policies:
+        patterns = policy.condition.modes
+        if patterns is None or any(has_magic(p) for p in patterns):
+            return None
+        modes.update(p for p in patterns if p)
+    return frozenset(modes)
+
+
+def _sort_by_priority(policies: list[Policy]) -> tuple[Policy, ...]:
+    """Return *policies* ordered by priority, keeping the order of ties.
+
+    Policy files are usually written in priority order already; checking
+    for that first avoids the key list and copy made by ``sorted``.
+    """
+    for prev, policy in zip(policies, policies[1:]):
+        if policy.priority < prev.priority:
+            return tuple(sorted(policies, key=attrgetter("priority")))
+    return tuple(policies)
+
+
+def _flatten_fallbacks(
+    fallbacks: dict[str, str], reachable: frozenset[str] | None = None
+) -> dict[str, tuple[str, ...]]:
+    """Resolve each mode's fallback chain into the ordered modes to retry.
+
+    The starting mode itself is not included, and a chain stops before
+    the first mode it has already visited, so cycles are broken the same
+    way as walking the chain at evaluation time.  When *reachable* is
+    given, modes outside it -- which no policy can match -- are left out
+    of the result (the walk itself still follows them).
+    """
+    chains: dict[str, tuple[str, ...]] = {}
+    for start in fallbacks:
+        chain: list[str] = []
+        visited = {start}
+        mode = start
+        while mode in fallbacks:
+            mode = fallbacks[mode]
+            if mode in visited:
+                break
+            visited.add(mode)
+            if reachable is None or mode in reachable:
+                chain.append(mode)
+        chains[start] = tuple(chain)
+    return chains
+
+
+def _first_match(
+    matchers: Sequence[Callable[[EvalContext, str], bool]],
+    mask: int,
+    ctx: EvalContext,
+    mode: str,
+) -> int:
+    """Return the lowest position set in *mask* whose matcher accepts *ctx*, or -1."""
+    while mask:
+        low = mask & -mask
+        pos = low.bit_length() - 1
+        if matchers[pos](ctx, mode):
+            return pos
+        mask ^= low
+    return -1
+
+
+@functools.cache
+def _numpy() -> Any:
+    """Return the numpy module, or None when it is not installed.
+
+    Imported on first use: the engine does not otherwise need NumPy.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+@functools.lru_cache(maxsize=1024)
+def _matcher_code(source: str) -> CodeType:
+    """Compile generated matcher *source* and return the function's code.
+
+    Constants are referenced by name, so the source depends only on the
+    shape of a condition; caching it skips ``compile`` for every policy
+    that repeats a shape already seen.
+    """
+    module = compile(source, "<policy>", "exec")
+    return next(c for c in module.co_consts if isinstance(c, CodeType))
+
+
+def _compile_matcher(
+    policy: Policy, matchers: dict[str, CompiledPatterns], order: list[tuple[str, str]]
+) -> Callable[[EvalContext, str], bool]:
+    """Generate a matcher function specialised for *policy*'s condition.
+
+    The condition is static once loaded, so instead of re-checking which
+    fields are set on every call, emit straight-line code that tests only
+    the fields the condition uses (*matchers*, from
+    :func:`_compile_condition`), in *order* -- except that fields
+    needing a glob match go after those decided by a set lookup.  The
+    generated function takes the context and the mode to match
+    (``ctx.mode`` or a fallback mode) and is otherwise equivalent to
+    :func:`_condition_matches`.  Conditions of the same shape produce
+    the same source, which is compiled only once (see
+    :func:`_matcher_code`).
+
+    When the optional C extension is built, a typed
+    :class:`CompiledCondition` is returned instead.
+    """
+    # Within the engine-wide order, run this condition's set lookups
+    # before its glob matches (the sort is stable).
+    order = sorted(
+        (f for f in order if f[0] in matchers), key=lambda f: matchers[f[0]].cost
+    )
+    if CompiledCondition is not None:
+        return CompiledCondition(matchers, order)
+    namespace: dict[str, Any] = {}
+
+    def bind(value: Any) -> str:
+        name = f"_c{len(namespace)}"
+        namespace[name] = value
+        return name
+
+    lines = ["def _match(ctx, mode):"]
+    for cond_attr, ctx_attr in order:
+        compiled = matchers[cond_attr]
+        # An unset mcp_server never matches an mcp_servers condition.
+        required = cond_attr == "mcp_servers"
+        if compiled.match_all and not required:
+            continue
+        # Unset context values are "": when no pattern can match that,
+        # reject it with a truth test before any glob call.
+        misses = ["not v"] if required or (compiled.globs and not compiled("")) else []
+        if not compiled.match_all:
+            if not compiled.literals and not compiled.globs:
+                # Only empty patterns: the field can never match.
+                lines.append("    return False")
+                break
+            parts = []
+            if compiled.literals:
+                parts.append(f"v not in {bind(compiled.literals)}")
+            if compiled.globs:
+                globs = " or ".join(f"{bind(g)}(v)" for g in compiled.globs)
+                parts.append(f"not ({globs})")
+            misses.append(f"({' and '.join(parts)})")
+        lines.append("    v = mode" if ctx_attr == "mode" else f"    v = ctx.{ctx_attr}")
+        lines.append(f"    if {' or '.join(misses)}:")
+        lines.append("        return False")
+    else:
+        lines.append("    return True")
+    code = _matcher_code("\n".join(lines)).replace(co_filename=f"<policy {policy.id}>")
+    return FunctionType(code, namespace)
+
+
+class _LoadedSet:
+    """Everything the engine derives from one loaded policy set.
+
+    :meth:`PolicyEngine.load` builds a complete instance and swaps it in
+    with a single assignment, so a concurrent evaluation sees either the
+    old or the new policy set, never a mix of both.  The verdict cache
+    lives here too: verdicts computed against a replaced set land in
+    that set's cache, not in the new one.  Cache insertions and
+    evictions are serialised by ``lock``; everything else is read-only
+    once built (``columns`` is filled in on first use, idempotently).
+    """
+
+    __slots__ = (
+        "cache",
+        "cache_size",
+        "columns",
+        "conditions",
+        "context_fallbacks",
+        "defaults",
+        "enabled_policies",
+        "fallback_chains",
+        "index",
+        "literal_modes",
+        "lock",
+        "no_match",
+        "policies",
+        "scan",
+        "verdicts",
+    )
+
+    def __init__(self, policy_set: PolicySet, *, cache_size: int, optimize: bool) -> None:
+        self.cache: OrderedDict[EvalContext, Verdict] = OrderedDict()
+        self.cache_size = cache_size
+        self.lock = threading.Lock()
+        self.defaults = policy_set.defaults
+        self.policies = _sort_by_priority(policy_set.policies)
+        enabled = [p for p in self.policies if p.enabled]
+        if optimize:
+            enabled = optimize_policies(enabled)
+        self.enabled_policies = tuple(enabled)
+        self.index = PolicyIndex(self.enabled_policies)
+        self.conditions = tuple(_compile_condition(p.condition) for p in self.policies)
+        compiled = {id(p.condition): c for p, c in zip(self.policies, self.conditions)}
+        for p in self.enabled_policies:
+            # Policies merged by the optimizer carry new conditions.
+            if id(p.condition) not in compiled:
+                compiled[id(p.condition)] = _compile_condition(p.condition)
+        order = _field_order(self.enabled_policies)
+        matchers = [
+            _compile_matcher(p, compiled[id(p.condition)], order) for p in self.enabled_policies
+        ]
+        self.scan: Callable[[int, EvalContext, str], int]
+        if CompiledCondition is not None:
+            self.scan = Scanner(matchers).first_match
+        else:
+            self.scan = functools.partial(_first_match, matchers)
+        # Verdicts only depend on the policy (or the defaults), and are
+        # immutable: build each one once and share it between calls.
+        self.verdicts = tuple(
+            Verdict(effect=p.effect, channel=p.channel, policy_id=p.id)
+            for p in self.enabled_policies
+        )
+        self.no_match = Verdict(effect=self.defaults.effect, channel=self.defaults.channel)
+        self.columns: tuple[tuple[Any, ...], ...] | None = None
+        self.literal_modes = _literal_modes(self.enabled_policies)
+        self.context_fallbacks = dict(policy_set.context_fallbacks)
+        self.fallback_chains = _flatten_fallbacks(self.context_fallbacks, self.literal_modes)
+
+    def policy_verdict(self, pos: int, ctx: EvalContext, mode: str) -> Verdict:
+        """Return the verdict for the enabled policy at *pos*."""
+        verdict = self.verdicts[pos]
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "[guard.match] policy=%s effect=%s tool=%s mode=%s",
+                verdict.policy_id,
+                verdict.effect.value,
+                ctx.tool,
+                mode,
+            )
+        return verdict
+
+    def evaluate_once(self, ctx: EvalContext, mode: str) -> Verdict | None:
+        """Try to match a single policy against the given context.
+
+        *mode* stands in for ``ctx.mode`` (it differs while walking the
+        fallback chain).  Returns a :class:`Verdict` on match, or ``None``
+        when no enabled policy's condition matches.
+        """
+        pos = self.scan(self.index.candidate_mask(ctx, mode), ctx, mode)
+        return self.policy_verdict(pos, ctx, mode) if pos >= 0 else None
+
+    def evaluate_fallbacks(self, ctx: EvalContext) -> Verdict:
+        """Walk the fallback chain of ``ctx.mode``, then return the defaults.
+
+        Only the ``modes`` part of the index lookup depends on the mode:
+        the rest -- including any glob-set scans of the context's values
+        -- is done once for the whole chain, not once per mode.
+        """
+        index = self.index
+        context_mask = -1  # not looked up yet
+        for mode in self.fallback_chains.get(ctx.mode, ()):
+            mask = index.mode_mask(mode)
+            if not mask:
+                continue
+            if context_mask < 0:
+                context_mask = index.context_mask(ctx)
+            pos = self.scan(mask & context_mask, ctx, mode)
+            if pos >= 0:
+                return self.policy_verdict(pos, ctx, mode)
+
+        return self.default_verdict(ctx)
+
+    def modes_unreachable(self, mode: str) -> bool:
+        """Return True if no policy can match *mode* or any of its fallbacks.
+
+        Only decidable when every enabled policy restricts ``modes`` to
+        literal values; otherwise this conservatively returns False.
+        """
+        literal_modes = self.literal_modes
+        if literal_modes is None or mode in literal_modes:
+            return False
+        # Chains only keep modes in literal_modes (see __init__).
+        return not self.fallback_chains.get(mode)
+
+    def default_verdict(self, ctx: EvalContext) -> Verdict:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "[guard.default] tool=%s mode=%s effect=%s",
+                ctx.tool,
+                ctx.mode,
+                self.no_match.effect.value,
+            )
+        return self.no_match
+
+    def cached(self, ctx: EvalContext) -> Verdict | None:
+        """Return the cached verdict for *ctx*, marking it recently used."""
+        cache = self.cache
+        verdict = cache.get(ctx)
+        if verdict is not None:
+            # Not locked: hits are far more frequent than writes, and
+            # move_to_end() is a single OrderedDict operation.  The entry
+            # may have been evicted by another thread since the lookup.
+            try:
+                cache.move_to_end(ctx)
+            except KeyError:
+                pass
+        return verdict
+
+    def remember(self, ctx: EvalContext, verdict: Verdict) -> None:
+        """Store *verdict* in the cache, evicting the least recently used entry if full."""
+        if self.cache_size > 0:
+            cache = self.cache
+            with self.lock:
+                cache[ctx] = verdict
+                if len(cache) > self.cache_size:
+                    cache.popitem(last=False)
+
+    def matched(self, ctx: EvalContext) -> list[bool]:
+        """Return, for every loaded policy in order, whether it matches *ctx*."""
+        return [
+            policy.enabled and _condition_matches(matchers, ctx)
+            for policy, matchers in zip(self.policies, self.conditions)
+        ]
+
+
 class PolicyEngine:
     """Evaluates tool invocations against a PolicySet.
 
     Policies are sorted by priority (ascending).  The first matching
     enabled policy wins.  If nothing matches, the engine falls back
     to the PolicySet's defaults.
+
+    An inverted index over the ``tools``, ``modes``, ``models``,
+    ``mcp_servers``, ``risk`` and ``channels`` fields is built on load,
+    mapping each value to a bitmask of policies, so evaluation only checks
+    the conditions of policies that can possibly match.  Each policy's
+    condition is compiled into a matcher function that tests only the
+    fields it sets, ordered from most to least selective across the
+    loaded set.
+
+    Verdicts are cached per :class:`EvalContext` (up to *cache_size*
+    entries, least recently used evicted first); the cache is cleared whenever a new
+    policy set is loaded.  Pass ``cache_size=0`` to disable it.
+
+    With ``optimize=True``, duplicate and shadowed policies are dropped
+    and neighbouring same-effect policies are merged on load (see
+    :func:`~agent_policy_guard.optimize.optimize_policies`).  Effects and
+    channels are unchanged, but verdicts may report the id of the
+    surviving policy; leave it off when ``policy_id`` feeds an audit trail.
+
+    An engine can be shared between threads: evaluations may run
+    concurrently with each other and with :meth:`load`, and each sees
+    one consistent policy set.
     """
 
-    def __init__(self, policy_set: PolicySet | None = None) -> None:
-        self._defaults = Defaults()
-        self._policies: list[Policy] = []
-        self._context_fallbacks: dict[str, str] = {}
-        if policy_set is not None:
-            self.load(policy_set)
+    __slots__ = ("_cache_size", "_loaded", "_optimize")
+
+    def __init__(
+        self,
+        policy_set: PolicySet | None = None,
+        *,
+        cache_size: int = 4096,
+        optimize: bool = False,
+    ) -> None:
+        self._cache_size = cache_size
+        self._optimize = optimize
+        self.load(policy_set if policy_set is not None else PolicySet())
 
     # ── Loading ──────────────────────────────────────────────────────
 
     def load(self, policy_set: PolicySet) -> None:
         """Load (or replace) the active policy set."""
-        self._defaults = policy_set.defaults
-        self._policies = sorted(policy_set.policies, key=lambda p: p.priority)
-        self._context_fallbacks = dict(policy_set.context_fallbacks)
+        self._loaded = _LoadedSet(
+            policy_set, cache_size=self._cache_size, optimize=self._optimize
+        )
 
     @property
     def policies(self) -> list[Policy]:
         """Return the currently loaded policies (sorted by priority)."""
-        return list(self._policies)
+        return list(self._loaded.policies)
 
     @property
     def defaults(self) -> Defaults:
-        return self._defaults
+        return self._loaded.defaults
 
     @property
     def context_fallbacks(self) -> dict[str, str]:
         """Return the context fallback chain."""
-        return dict(self._context_fallbacks)
+        return dict(self._loaded.context_fallbacks)
 
     # ── Evaluation ───────────────────────────────────────────────────
 
-    def _evaluate_once(self, ctx: EvalContext) -> Verdict | None:
-        """Try to match a single policy against the given context.
-
-        Returns a :class:`Verdict` on match, or ``None`` when no enabled
-        policy's condition matches.
-        """
-        for policy in self._policies:
-            if not policy.enabled:
-                continue
-            if _condition_matches(policy.condition, ctx):
-                logger.debug(
-                    "[guard.match] policy=%s effect=%s tool=%s mode=%s",
-                    policy.id,
-                    policy.effect.value,
-                    ctx.tool,
-                    ctx.mode,
-                )
-                return Verdict(
-                    effect=policy.effect,
-                    channel=policy.channel,
-                    policy_id=policy.id,
-                )
-        return None
-
     def evaluate(self, ctx: EvalContext) -> Verdict:
         """Evaluate all policies and return a verdict for the given context.
 
@@ -123,34 +500,50 @@ class PolicyEngine:
         fallback mode until a match is found or the chain is exhausted.
 
         If nothing matches after all fallbacks, returns the defaults.
+        Results are served from the verdict cache when *ctx* was seen
+        before.
         """
-        verdict = self._evaluate_once(ctx)
+        loaded = self._loaded
+        verdict = loaded.cached(ctx)
         if verdict is not None:
             return verdict
+        if loaded.modes_unreachable(ctx.mode):
+            verdict = loaded.default_verdict(ctx)
+        else:
+            verdict = loaded.evaluate_once(ctx, ctx.mode)
+            if verdict is None:
+                verdict = loaded.evaluate_fallbacks(ctx)
+        loaded.remember(ctx, verdict)
+        return verdict
 
-        # Walk the context fallback chain
-        mode = ctx.mode
-        visited = {mode}
-        while mode in self._context_fallbacks:
-            mode = self._context_fallbacks[mode]
-            if mode in visited:
-                break
-            visited.add(mode)
-            verdict = self._evaluate_once(replace(ctx, mode=mode))
-            if verdict is not None:
-                return verdict
-
-        logger.debug(
-            "[guard.default] tool=%s mode=%s effect=%s",
-            ctx.tool,
-            ctx.mode,
-            self._defaults.effect.value,
-        )
-        return Verdict(
-            effect=self._defaults.effect,
-            channel=self._defaults.channel,
-            policy_id=None,
-        )
+    def batch_evaluate(self, contexts: Sequence[EvalContext]) -> list[Verdict]:
+        """Evaluate many contexts, returning one verdict per context.
+
+        Produces exactly the verdicts :meth:`evaluate` would.  Uncached
+        contexts go through the index together, looking up each field
+        once per distinct value in the batch, and repeated contexts are
+        evaluated once.
+        """
+        loaded = self._loaded
+        results = [loaded.cached(ctx) for ctx in contexts]
+        pending = [i for i, verdict in enumerate(results) if verdict is None]
+        if not pending:
+            return results  # type: ignore[return-value]
+        todo = [contexts[i] for i in pending]
+        masks = loaded.index.candidate_masks(todo)
+        seen: dict[EvalContext, Verdict] = {}
+        for i, ctx, mask in zip(pending, todo, masks):
+            verdict = seen.get(ctx)
+            if verdict is None:
+                pos = loaded.scan(mask, ctx, ctx.mode)
+                if pos >= 0:
+                    verdict = loaded.policy_verdict(pos, ctx, ctx.mode)
+                else:
+                    verdict = loaded.evaluate_fallbacks(ctx)
+                seen[ctx] = verdict
+                loaded.remember(ctx, verdict)
+            results[i] = verdict
+        return results  # type: ignore[return-value]
 
     def resolve(self, ctx: EvalContext) -> str:
         """Convenience method returning just the effect string.
@@ -164,17 +557,46 @@ class PolicyEngine:
         """Evaluate all policies and return match results for every policy.
 
         Useful for debugging and audit trails.  Returns a list of dicts,
-        one per policy, with ``matched`` and ``policy_id`` keys.
+        one per policy, with ``matched`` and ``policy_id`` keys.  See
+        :meth:`evaluate_all_columnar` for a more compact result.
         """
-        results: list[dict[str, Any]] = []
-        for policy in self._policies:
-            matched = policy.enabled and _condition_matches(policy.condition, ctx)
-            results.append({
+        loaded = self._loaded
+        return [
+            {
                 "policy_id": policy.id,
                 "name": policy.name,
                 "priority": policy.priority,
                 "effect": policy.effect.value,
                 "matched": matched,
                 "enabled": policy.enabled,
-            })
-        return results
+            }
+            for policy, matched in zip(loaded.policies, loaded.matched(ctx))
+        ]
+
+    def evaluate_all_columnar(
+        self, ctx: EvalContext, *, as_numpy: bool = False
+    ) -> PolicyMatches:
+        """Like :meth:`evaluate_all`, but return one column per attribute.
+
+        Only ``matched`` is computed per call; the other columns are
+        built once per loaded policy set and shared between results.
+        With ``as_numpy=True``, ``matched`` is a NumPy boolean array
+        instead of a tuple; this raises ImportError without NumPy.
+        """
+        loaded = self._loaded
+        if loaded.columns is None:
+            policies = loaded.policies
+            loaded.columns = (
+                tuple(p.id for p in policies),
+                tuple(p.name for p in policies),
+                tuple(p.priority for p in policies),
+                tuple(p.effect for p in policies),
+                tuple(p.enabled for p in policies),
+            )
+        matched: Sequence[bool] = tuple(loaded.matched(ctx))
+        if as_numpy:
+            np = _numpy()
+            if np is None:
+                raise ImportError("evaluate_all_columnar(as_numpy=True) requires NumPy")
+            matched = np.array(matched, dtype=bool)
+        return PolicyMatches(*loaded.columns, matched=matched)
@@ -0,0 +1,151 @@
+"""Matching one value against many glob patterns at once."""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections.abc import Callable, Iterable, Sequence
+
+from .match import compile_pattern
+
+try:
+    import hyperscan
+except ImportError:  # optional dependency: pip install agent-policy-guard[hyperscan]
+    hyperscan = None
+
+try:
+    import re2
+except ImportError:  # optional dependency: pip install agent-policy-guard[re2]
+    re2 = None
+
+# Below these many distinct patterns, calling the compiled matchers one
+# by one is cheaper than a multi-pattern scan.  RE2 wins earlier: on
+# short values like tool names, Hyperscan's Python match callbacks cost
+# more than the scan itself.
+RE2_MIN_PATTERNS = 8
+HYPERSCAN_MIN_PATTERNS = 16
+
+
+def _to_regex(pattern: str) -> str | None:
+    """Translate a ``*``/``?`` glob into an unanchored regex body.
+
+    Returns None for patterns using ``[...]`` classes: their edge cases
+    (``[!]``, ``[]]``, unterminated ``[``) follow fnmatch rules that are
+    easiest to keep exact by leaving them to :func:`compile_pattern`.
+    """
+    if "[" in pattern:
+        return None
+    return "".join(".*" if c == "*" else "." if c == "?" else re.escape(c) for c in pattern)
+
+
+class GlobSet:
+    """A fixed collection of ``(glob pattern, bit)`` pairs.
+
+    :meth:`matching` returns a bitmask with the bit of every pattern that
+    matches a value set, with the same semantics as
+    :func:`~agent_policy_guard.match.glob_match`.  Repeated patterns are
+    tested once.  Patterns are tested one by one with their compiled
+    matchers, unless there are enough of them and RE2 or Hyperscan is
+    installed (RE2 is preferred when both are): then they are compiled
+    into a single automaton that reports every match in one pass over
+    the value.
+
+    *min_patterns* overrides the number of distinct patterns from which
+    the automaton is used (:data:`RE2_MIN_PATTERNS` or
+    :data:`HYPERSCAN_MIN_PATTERNS`, depending on the library).
+    """
+
+    def __init__(
+        self,
+        entries: Sequence[tuple[str, int]],
+        *,
+        min_patterns: int | None = None,
+    ) -> None:
+        masks: dict[str, int] = {}
+        for pattern, bit in entries:
+            masks[pattern] = masks.get(pattern, 0) | 1 << bit
+        self._entries = [(compile_pattern(pattern), mask) for pattern, mask in masks.items()]
+        self._fallback = self._entries
+        self._scan: Callable[[str], Iterable[int]] | None = None
+        self._masks: list[int] = []
+        if re2 is not None:
+            if len(masks) >= (RE2_MIN_PATTERNS if min_patterns is None else min_patterns):
+                self._compile(masks, self._re2_scanner)
+        elif hyperscan is not None:
+            if len(masks) >= (HYPERSCAN_MIN_PATTERNS if min_patterns is None else min_patterns):
+                self._compile(masks, self._hyperscan_scanner)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _compile(
+        self,
+        masks: dict[str, int],
+        scanner: Callable[[list[str]], Callable[[str], Iterable[int]]],
+    ) -> None:
+        """Move every translatable pattern into an automaton built by *scanner*."""
+        regexes: list[str] = []
+        fallback = []
+        for pattern, entry in zip(masks, self._entries):
+            regex = _to_regex(pattern)
+            if regex is None:
+                fallback.append(entry)
+            else:
+                regexes.append(regex)
+                self._masks.append(entry[1])
+        if regexes:
+            self._scan = scanner(regexes)
+            self._fallback = fallback
+
+    @staticmethod
+    def _hyperscan_scanner(regexes: list[str]) -> Callable[[str], Iterable[int]]:
+        flags = hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_DOTALL | hyperscan.HS_FLAG_UTF8
+        database = hyperscan.Database()
+        database.compile(
+            expressions=[f"^{regex}\\z".encode() for regex in regexes],
+            ids=list(range(len(regexes))),
+            elements=len(regexes),
+            flags=[flags] * len(regexes),
+        )
+        # A database has a single scratch space; scans must not overlap.
+        lock = threading.Lock()
+
+        def scan(value: str) -> list[int]:
+            data = value.encode("utf-8")
+            ids: list[int] = []
+            with lock:
+                database.scan(
+                    data, match_event_handler=lambda id, start, end, flags, ctx: ids.append(id)
+                )
+            return ids
+
+        return scan
+
+    @staticmethod
+    def _re2_scanner(regexes: list[str]) -> Callable[[str], Iterable[int]]:
+        options = re2.Options()
+        options.dot_nl = True
+        automaton = re2.Set.FullMatchSet(options)
+        for regex in regexes:
+            automaton.Add(regex)
+        automaton.Compile()
+        return lambda value: automaton.Match(value) or ()
+
+    def matching(self, value: str) -> int:
+        """Return the bits of all patterns matching *value*, OR-ed together."""
+        found = 0
+        fallback = self._fallback
+        if self._scan is not None:
+            try:
+                ids = self._scan(value)
+            except UnicodeEncodeError:
+                # Lone surrogates are not valid UTF-8 input for the automaton.
+                ids = ()
+                fallback = self._entries
+            masks = self._masks
+            for i in ids:
+                found |= masks[i]
+        for matcher, mask in fallback:
+            if matcher(value):
+                found |= mask
+        return found
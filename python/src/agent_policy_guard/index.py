@@ -0,0 +1,151 @@
+"""Inverted index used to narrow the policies a context can match."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from .globset import GlobSet
+from .match import has_magic
+from .models import _CONTEXT_ATTRS, EvalContext, Policy
+
+# (condition attribute, context attribute) pairs covered by the index:
+# every field but users and sessions, which are rarely set.
+INDEXED_FIELDS: tuple[tuple[str, str], ...] = tuple(
+    (name, attr) for name, attr in _CONTEXT_ATTRS.items() if name not in ("users", "sessions")
+)
+
+
+def _mask(positions: set[int]) -> int:
+    mask = 0
+    for pos in positions:
+        mask |= 1 << pos
+    return mask
+
+
+class _FieldIndex:
+    """Candidate buckets for a single condition field, as bitmasks.
+
+    Bit *n* of a mask stands for the policy at position *n*.  ``literal``
+    maps an exact pattern to the policies listing it.  ``globs`` holds
+    every glob pattern with its policy's bit.  ``base`` has the bits of
+    policies that leave the field unset or list ``"*"`` -- those are
+    candidates for every value, and already included in ``literal``.
+    """
+
+    __slots__ = ("base", "globs", "literal")
+
+    def __init__(self) -> None:
+        self.literal: dict[str, int] = {}
+        self.base = 0
+        self.globs: GlobSet | None = None
+
+    def candidates(self, value: str) -> int:
+        hit = self.literal.get(value, self.base)
+        # The empty value's glob matches are stored under "" in literal.
+        if value and self.globs is not None:
+            hit |= self.globs.matching(value)
+        return hit
+
+
+class PolicyIndex:
+    """Maps context values to the positions of policies that may match them.
+
+    Built once per loaded policy list.  For every indexed field, literal
+    patterns are bucketed by pattern and glob patterns are collected into
+    a :class:`~agent_policy_guard.globset.GlobSet` (a single Hyperscan
+    database when that is installed and the field has many globs);
+    policies that leave the field unset or list ``"*"`` are candidates for
+    any value.  Buckets are bitmasks over policy positions, so looking up
+    a context ANDs one integer per indexed field, and only the surviving
+    policies need a full condition check.
+
+    The result is a superset of the matching policies -- callers must
+    still evaluate each candidate's condition.
+    """
+
+    def __init__(self, policies: Sequence[Policy]) -> None:
+        self._all = (1 << len(policies)) - 1
+        self._mode: _FieldIndex | None = None
+        self._fields: list[tuple[str, _FieldIndex]] = []
+        for cond_attr, ctx_attr in INDEXED_FIELDS:
+            literal: dict[str, set[int]] = {}
+            globs: list[tuple[str, int]] = []
+            base: set[int] = set()
+            for pos, policy in enumerate(policies):
+                patterns = getattr(policy.condition, cond_attr)
+                if patterns is None or "*" in patterns:
+                    base.add(pos)
+                    continue
+                for pattern in patterns:
+                    if has_magic(pattern):
+                        globs.append((pattern, pos))
+                    # An empty pattern never matches (see glob_match).
+                    elif pattern:
+                        literal.setdefault(pattern, set()).add(pos)
+            if len(base) == len(policies):
+                # Nothing to narrow on for this field.
+                continue
+            field_index = _FieldIndex()
+            field_index.base = _mask(base)
+            field_index.literal = {
+                pattern: _mask(positions | base) for pattern, positions in literal.items()
+            }
+            if globs:
+                field_index.globs = GlobSet(globs)
+                # An empty pattern is never a literal, so "" is free to
+                # hold what an unset context value matches.
+                field_index.literal[""] = field_index.base | field_index.globs.matching("")
+            if ctx_attr == "mode":
+                self._mode = field_index
+            else:
+                self._fields.append((ctx_attr, field_index))
+
+    def candidate_mask(self, ctx: EvalContext, mode: str) -> int:
+        """Return the candidate policies for *ctx* as a bitmask.
+
+        Bit *n* is set when the policy at position *n* may match.  *mode*
+        is used in place of ``ctx.mode``, so callers can look up fallback
+        modes without building a new context.
+        """
+        mask = self.mode_mask(mode)
+        if mask:
+            mask &= self.context_mask(ctx)
+        return mask
+
+    def mode_mask(self, mode: str) -> int:
+        """Return the candidates allowed by the ``modes`` field for *mode*."""
+        return self._all if self._mode is None else self._mode.candidates(mode)
+
+    def context_mask(self, ctx: EvalContext) -> int:
+        """Return the candidates allowed by every indexed field but ``modes``.
+
+        Independent of the mode, so it can be computed once and combined
+        with :meth:`mode_mask` for each mode of a fallback chain.
+        """
+        mask = self._all
+        for ctx_attr, field_index in self._fields:
+            if not mask:
+                break
+            mask &= field_index.candidates(getattr(ctx, ctx_attr))
+        return mask
+
+    def candidate_masks(self, contexts: Sequence[EvalContext]) -> list[int]:
+        """Return :meth:`candidate_mask` for each of *contexts*, at its own mode.
+
+        Each field is looked up once per distinct value in the batch, so
+        a glob scan is shared by every context carrying the same value.
+        """
+        masks = [self._all] * len(contexts)
+        fields = self._fields if self._mode is None else [("mode", self._mode), *self._fields]
+        for ctx_attr, field_index in fields:
+            hits: dict[str, int] = {}
+            for i, ctx in enumerate(contexts):
+                mask = masks[i]
+                if not mask:
+                    continue
+                value = getattr(ctx, ctx_attr)
+                hit = hits.get(value)
+                if hit is None:
+                    hit = hits[value] = field_index.candidates(value)
+                masks[i] = mask & hit
+        return masks
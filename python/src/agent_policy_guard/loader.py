@@ -2,39 +2,100 @@
 
 from __future__ import annotations
 
+import json
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import replace
 from pathlib import Path
 from typing import Any
 
 import yaml
 
-from .models import Channel, Condition, Defaults, Effect, Metadata, Policy, PolicySet
+try:  # libyaml bindings are several times faster when available
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # pragma: no cover - depends on how PyYAML was built
+    from yaml import SafeLoader as _SafeLoader  # type: ignore[assignment]
+
+from .models import (
+    _CONDITION_FIELDS,
+    Channel,
+    Condition,
+    Defaults,
+    Effect,
+    Metadata,
+    Policy,
+    PolicySet,
+)
+
+# Resolved enum members keyed by their raw string.  ``Effect(...)`` and
+# ``Channel(...)`` go through ``EnumMeta.__call__`` (and ``_missing_`` for
+# custom effects); most documents reuse a handful of values, so resolve
+# each one once.
+_EFFECT_CACHE: dict[str, Effect] = {e.value: e for e in Effect}
+_CHANNEL_CACHE: dict[str, Channel] = {c.value: c for c in Channel}
+
+
+def _to_effect(value: str) -> Effect:
+    effect = _EFFECT_CACHE.get(value)
+    if effect is None:
+        effect = _EFFECT_CACHE.setdefault(value, Effect(value))
+    return effect
+
+
+def _to_channel(value: str) -> Channel:
+    channel = _CHANNEL_CACHE.get(value)
+    if channel is None:
+        # Raises ValueError for unknown channels, which are never cached.
+        channel = _CHANNEL_CACHE.setdefault(value, Channel(value))
+    return channel
+
+
+def _parse_patterns(raw: dict[str, Any], name: str) -> list[str] | None:
+    """Return the *name* patterns of a raw condition, validated and interned.
+
+    Pattern strings are interned so equality checks against context
+    values built from string literals short-circuit on identity.
+    """
+    patterns = raw.get(name)
+    if patterns is None:
+        return None
+    if not isinstance(patterns, (list, tuple)):
+        raise ValueError(f"condition.{name} must be a list of strings, got {patterns!r}")
+    for pattern in patterns:
+        if not isinstance(pattern, str):
+            raise ValueError(
+                f"condition.{name} patterns must be strings, got {pattern!r} "
+                f"({type(pattern).__name__}); quote it in YAML"
+            )
+    return [sys.intern(p) if type(p) is str else p for p in patterns]
 
 
 def _parse_condition(raw: dict[str, Any] | None) -> Condition:
     if not raw:
         return Condition()
     return Condition(
-        modes=raw.get("modes"),
-        models=raw.get("models"),
-        channels=raw.get("channels"),
-        tools=raw.get("tools"),
-        mcp_servers=raw.get("mcp_servers"),
-        risk=raw.get("risk"),
-        users=raw.get("users"),
-        sessions=raw.get("sessions"),
+        modes=_parse_patterns(raw, "modes"),
+        models=_parse_patterns(raw, "models"),
+        channels=_parse_patterns(raw, "channels"),
+        tools=_parse_patterns(raw, "tools"),
+        mcp_servers=_parse_patterns(raw, "mcp_servers"),
+        risk=_parse_patterns(raw, "risk"),
+        users=_parse_patterns(raw, "users"),
+        sessions=_parse_patterns(raw, "sessions"),
     )
 
 
 def _parse_policy(raw: dict[str, Any]) -> Policy:
     return Policy(
         id=raw["id"],
-        effect=Effect(raw["effect"]),
+        effect=_to_effect(raw["effect"]),
         name=raw.get("name", ""),
         description=raw.get("description", ""),
         enabled=raw.get("enabled", True),
         priority=raw.get("priority", 100),
         condition=_parse_condition(raw.get("condition")),
-        channel=Channel(raw.get("channel", "chat")),
+        channel=_to_channel(raw.get("channel", "chat")),
     )
 
 
@@ -42,8 +103,8 @@ def _parse_defaults(raw: dict[str, Any] | None) -> Defaults:
     if not raw:
         return Defaults()
     return Defaults(
-        effect=Effect(raw.get("effect", "ask")),
-        channel=Channel(raw.get("channel", "chat")),
+        effect=_to_effect(raw.get("effect", "ask")),
+        channel=_to_channel(raw.get("channel", "chat")),
     )
 
 
@@ -74,15 +135,83 @@ def load_policy_set_from_dict(data: dict[str, Any]) -> PolicySet:
     )
 
 
-def load_policy_set_from_str(text: str) -> PolicySet:
-    """Parse a PolicySet from a YAML string."""
-    data = yaml.safe_load(text)
+def _parse_document(text: str | bytes) -> Any:
+    # JSON is (nearly) a subset of YAML, and the json module's C scanner
+    # is far faster than any YAML loader -- try it first on documents
+    # that look like JSON, e.g. policy sets generated by other tools.
+    if text.lstrip()[:1] in ("{", b"{"):
+        try:
+            return json.loads(text)
+        except ValueError:
+            pass  # a YAML flow mapping rather than JSON
+    return yaml.load(text, Loader=_SafeLoader)
+
+
+def load_policy_set_from_str(text: str | bytes) -> PolicySet:
+    """Parse a PolicySet from a YAML or JSON string (or UTF-8/UTF-16 encoded bytes)."""
+    data = _parse_document(text)
     if not isinstance(data, dict):
         raise ValueError("Expected a YAML mapping at the top level")
     return load_policy_set_from_dict(data)
 
 
-def load_policy_set(path: str | Path) -> PolicySet:
-    """Load a PolicySet from a YAML file on disk."""
+# Parsed files keyed by resolved path, with the (st_mtime_ns, st_size)
+# they were parsed at.  Bounded, least recently used evicted first.
+_FILE_CACHE_SIZE = 64
+_file_cache: OrderedDict[str, tuple[tuple[int, int], PolicySet]] = OrderedDict()
+_file_cache_lock = threading.Lock()
+
+
+def _copy_condition(cond: Condition) -> Condition:
+    # Conditions are frozen but their pattern lists are not: give each
+    # copy its own lists.
+    copies = {}
+    for name in _CONDITION_FIELDS:
+        patterns = getattr(cond, name)
+        copies[name] = None if patterns is None else list(patterns)
+    return Condition(**copies)
+
+
+def _copy_policy_set(ps: PolicySet) -> PolicySet:
+    # Copy every mutable container, down to the condition pattern lists,
+    # so callers cannot alter the cached instance.
+    return PolicySet(
+        api_version=ps.api_version,
+        kind=ps.kind,
+        metadata=Metadata(
+            name=ps.metadata.name,
+            description=ps.metadata.description,
+            version=ps.metadata.version,
+            labels=dict(ps.metadata.labels),
+        ),
+        defaults=Defaults(effect=ps.defaults.effect, channel=ps.defaults.channel),
+        policies=[replace(p, condition=_copy_condition(p.condition)) for p in ps.policies],
+        context_fallbacks=dict(ps.context_fallbacks),
+    )
+
+
+def load_policy_set(path: str | Path, *, cache: bool = True) -> PolicySet:
+    """Load a PolicySet from a YAML (or JSON) file on disk.
+
+    Parsed files are cached: while a file's modification time and size
+    are unchanged, later calls return a copy of the earlier result
+    without re-reading it.  Pass ``cache=False`` to always parse.
+    """
     p = Path(path)
-    return load_policy_set_from_str(p.read_text(encoding="utf-8"))
+    if not cache:
+        return load_policy_set_from_str(p.read_bytes())
+    key = str(p.resolve())
+    st = p.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _file_cache_lock:
+        entry = _file_cache.get(key)
+        if entry is not None and entry[0] == stamp:
+            _file_cache.move_to_end(key)
+            return _copy_policy_set(entry[1])
+    ps = load_policy_set_from_str(p.read_bytes())
+    with _file_cache_lock:
+        _file_cache[key] = (stamp, ps)
+        _file_cache.move_to_end(key)
+        if len(_file_cache) > _FILE_CACHE_SIZE:
+            _file_cache.popitem(last=False)
+    return _copy_policy_set(ps)
@@ -3,6 +3,21 @@
 from __future__ import annotations
 
 import fnmatch
+import functools
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+Matcher = Callable[[str], bool]
+"""A precompiled pattern: called with a value, returns whether it matches."""
+
+_MAGIC_CHARS = frozenset("*?[")
+
+
+def has_magic(pattern: str) -> bool:
+    """Return True if *pattern* contains glob metacharacters (``*``, ``?``, ``[``)."""
+    return not _MAGIC_CHARS.isdisjoint(pattern)
 
 
 def glob_match(pattern: str, value: str) -> bool:
@@ -15,14 +30,58 @@ def glob_match(pattern: str, value: str) -> bool:
     - ``pre*suf`` matches strings starting with pre and ending with suf
     - Exact match when no wildcards are present
 
-    Uses :func:`fnmatch.fnmatchcase` for full glob semantics (``*``,
-    ``?``, ``[seq]``, ``[!seq]``).
+    Full glob semantics (``*``, ``?``, ``[seq]``, ``[!seq]``) follow
+    :func:`fnmatch.fnmatchcase`.  Each pattern is classified by shape
+    once, on first use (see :func:`_classify`): literals, prefixes and
+    suffixes are then matched with plain string methods, and only other
+    globs go through a compiled regex.  ``glob_match.cache_clear()``
+    drops the classified patterns.
     """
     if not pattern:
         return False
     if pattern == "*":
         return True
-    return fnmatch.fnmatchcase(value, pattern)
+    shape, payload = _classify(pattern)
+    if shape == _LITERAL:
+        return value == payload
+    if shape == _PREFIX:
+        return value.startswith(payload)
+    if shape == _SUFFIX:
+        return value.endswith(payload)
+    return payload.match(value) is not None
+
+
+# Pattern shapes, as returned by _classify().
+_LITERAL, _PREFIX, _SUFFIX, _REGEX = range(4)
+
+
+@functools.lru_cache(maxsize=1024)
+def _classify(pattern: str) -> tuple[int, Any]:
+    """Return the shape of a non-empty *pattern* and what matching it needs.
+
+    The payload is the string to compare with (literal), the fixed part
+    of a ``prefix*`` or ``*suffix`` pattern, or a compiled regex.
+    """
+    if not has_magic(pattern):
+        return _LITERAL, pattern
+    if pattern.endswith("*") and not has_magic(pattern[:-1]):
+        return _PREFIX, pattern[:-1]
+    if pattern.startswith("*") and not has_magic(pattern[1:]):
+        return _SUFFIX, pattern[1:]
+    return _REGEX, _compile_regex(pattern)
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_regex(pattern: str) -> re.Pattern[str]:
+    return re.compile(fnmatch.translate(pattern))
+
+
+def _cache_clear() -> None:
+    _classify.cache_clear()
+    _compile_regex.cache_clear()
+
+
+glob_match.cache_clear = _cache_clear  # type: ignore[attr-defined]
 
 
 def list_matches(patterns: list[str] | None, value: str) -> bool:
@@ -30,3 +89,85 @@ def list_matches(patterns: list[str] | None, value: str) -> bool:
     if patterns is None:
         return True
     return any(glob_match(p, value) for p in patterns)
+
+
+def _match_nothing(value: str) -> bool:
+    return False
+
+
+def _match_everything(value: str) -> bool:
+    return True
+
+
+def compile_pattern(pattern: str) -> Matcher:
+    """Translate a glob pattern into a matcher, once.
+
+    The returned callable is equivalent to ``glob_match(pattern, value)``
+    but avoids re-parsing the pattern on every call.  Common shapes are
+    specialised: ``*`` is constant, literals compare with ``==``,
+    ``prefix*`` and ``*suffix`` use :meth:`str.startswith` /
+    :meth:`str.endswith`.  Anything else is compiled to a regex.
+    """
+    if not pattern:
+        return _match_nothing
+    if pattern == "*":
+        return _match_everything
+    shape, payload = _classify(pattern)
+    if shape == _LITERAL:
+        return payload.__eq__
+    if shape == _PREFIX:
+        return lambda value: value.startswith(payload)
+    if shape == _SUFFIX:
+        return lambda value: value.endswith(payload)
+    return lambda value: payload.match(value) is not None
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledPatterns:
+    """A condition field's pattern list, split for fast matching.
+
+    Literal patterns go into a frozenset (one hash lookup for any number
+    of them); the rest are kept as compiled glob matchers -- a single
+    regex alternation when there are several -- tested only when the set
+    lookup misses.  ``match_all`` is set when the list
+    contains ``*``.
+    """
+
+    literals: frozenset[str]
+    globs: tuple[Matcher, ...]
+    match_all: bool = False
+
+    @property
+    def cost(self) -> int:
+        """Rough relative cost of a check, for ordering a condition's fields.
+
+        0: can never match (only empty patterns) -- decided without
+        looking at the value; 1: set lookup only; 2: needs a glob match.
+        """
+        if self.globs and not self.match_all:
+            return 2
+        if self.literals or self.match_all:
+            return 1
+        return 0
+
+    def __call__(self, value: str) -> bool:
+        if self.match_all or value in self.literals:
+            return True
+        return any(g(value) for g in self.globs)
+
+
+def compile_patterns(patterns: list[str] | None) -> CompiledPatterns | None:
+    """Compile a condition field's pattern list (``None`` stays ``None``)."""
+    if patterns is None:
+        return None
+    literals = frozenset(p for p in patterns if p and not has_magic(p))
+    magic = [p for p in dict.fromkeys(patterns) if has_magic(p)]
+    if len(magic) > 1:
+        # One alternation runs the whole list in a single C-level match,
+        # which beats calling a Python matcher per pattern.
+        regex = re.compile("|".join(fnmatch.translate(p) for p in magic))
+        globs: tuple[Matcher, ...] = (lambda value: regex.match(value) is not None,)
+    else:
+        globs = tuple(compile_pattern(p) for p in magic)
+    return CompiledPatterns(literals, globs, match_all="*" in patterns)
+
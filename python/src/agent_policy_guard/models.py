@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 from enum import Enum
 
@@ -43,8 +44,16 @@ class Channel(str, Enum):
 # ── Context passed at evaluation time ────────────────────────────────────
 
 
-@dataclass(frozen=True)
-class EvalContext:
+class _ContextSlots:
+    # Derived state lives in a plain slot rather than a dataclass field so
+    # that fields(), asdict() and astuple() only see the declared values.
+    __slots__ = ("_hash",)
+
+    _hash: int
+
+
+@dataclass(frozen=True, slots=True)
+class EvalContext(_ContextSlots):
     """Snapshot of runtime state for a single tool invocation.
 
     All fields are optional.  The engine matches each field against the
@@ -60,11 +69,58 @@ class EvalContext:
     user: str = ""
     session: str = ""
 
+    def __post_init__(self) -> None:
+        # Contexts key the engine's verdict cache, so each one is hashed
+        # at least once: compute it up front rather than on first use.
+        object.__setattr__(
+            self,
+            "_hash",
+            hash(
+                (
+                    self.mode,
+                    self.model,
+                    self.channel,
+                    self.tool,
+                    self.mcp_server,
+                    self.risk,
+                    self.user,
+                    self.session,
+                )
+            ),
+        )
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __reduce__(self) -> tuple[type[EvalContext], tuple[str, ...]]:
+        # String hashes differ between processes: never pickle the cached one.
+        return (
+            EvalContext,
+            (
+                self.mode,
+                self.model,
+                self.channel,
+                self.tool,
+                self.mcp_server,
+                self.risk,
+                self.user,
+                self.session,
+            ),
+        )
+
+
+_CONDITION_FIELDS = (
+    "modes", "models", "channels", "tools", "mcp_servers", "risk", "users", "sessions"
+)
+# The EvalContext attribute each condition field is matched against: the
+# field name in the singular ("risk" is both).
+_CONTEXT_ATTRS = {name: name.removesuffix("s") for name in _CONDITION_FIELDS}
+
 
 # ── Policy definition ───────────────────────────────────────────────────
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Condition:
     """Matching criteria for a policy.
 
@@ -73,6 +129,12 @@ class Condition:
     ``None`` means "don't care" -- the field is not evaluated.
     String values support glob patterns: ``*`` matches everything,
     ``prefix*`` matches any string starting with prefix.
+
+    Conditions are frozen, but their pattern lists are ordinary lists:
+    build a new condition (e.g. with :func:`dataclasses.replace`) rather
+    than editing them in place.  The engine compiles the patterns when a
+    policy set is loaded, so edits made after that only take effect on
+    the next :meth:`~agent_policy_guard.PolicyEngine.load`.
     """
 
     modes: list[str] | None = None
@@ -85,9 +147,13 @@ class Condition:
     sessions: list[str] | None = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Policy:
-    """A single guardrail policy."""
+    """A single guardrail policy.
+
+    Policies are frozen; use :func:`dataclasses.replace` to derive a
+    modified copy.
+    """
 
     id: str
     effect: Effect
@@ -102,7 +168,7 @@ class Policy:
 # ── PolicySet (top-level document) ──────────────────────────────────────
 
 
-@dataclass
+@dataclass(slots=True)
 class Metadata:
     """Descriptive metadata for a policy set."""
 
@@ -112,7 +178,7 @@ class Metadata:
     labels: dict[str, str] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class Defaults:
     """Fallback behaviour when no policy matches."""
 
@@ -120,7 +186,7 @@ class Defaults:
     channel: Channel = Channel.chat
 
 
-@dataclass
+@dataclass(slots=True)
 class PolicySet:
     """A complete set of guardrail policies loaded from YAML."""
 
@@ -135,10 +201,28 @@ class PolicySet:
 # ── Evaluation result ───────────────────────────────────────────────────
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Verdict:
     """The result of evaluating a context against a policy set."""
 
     effect: Effect
     channel: Channel = Channel.chat
     policy_id: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class PolicyMatches:
+    """Every loaded policy checked against one context, stored by column.
+
+    Entry *i* of each field describes the *i*-th policy in priority
+    order.  ``matched`` is a tuple of bools, or a NumPy boolean array
+    when requested with ``as_numpy=True`` (such results do not support
+    ``==`` or ``hash()``).  Disabled policies never match.
+    """
+
+    policy_ids: tuple[str, ...]
+    names: tuple[str, ...]
+    priorities: tuple[int, ...]
+    effects: tuple[Effect, ...]
+    enabled: tuple[bool, ...]
+    matched: Sequence[bool]
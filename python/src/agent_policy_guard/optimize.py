@@ -0,0 +1,144 @@
+"""Load-time rewriting of policy lists that preserves their verdicts."""
+
+from __future__ import annotations
+
+from dataclasses import replace
+
+from .match import glob_match, has_magic
+from .models import _CONDITION_FIELDS, Condition, Policy
+
+
+def _condition_key(cond: Condition) -> tuple[tuple[str, ...] | None, ...]:
+    return tuple(
+        None if (patterns := getattr(cond, name)) is None else tuple(patterns)
+        for name in _CONDITION_FIELDS
+    )
+
+
+def _field_covers(name: str, outer: list[str] | None, inner: list[str] | None) -> bool:
+    """Return True if every value *inner* matches is also matched by *outer*."""
+    if outer is None:
+        return True
+    if "*" in outer:
+        # '*' matches any value -- except that mcp_servers patterns never
+        # match an unset server, which an unset (None) field does.
+        return inner is not None or name != "mcp_servers"
+    if inner is None:
+        return False
+    for pattern in inner:
+        if not pattern or pattern in outer:
+            continue
+        if has_magic(pattern) or not any(glob_match(o, pattern) for o in outer):
+            return False
+    return True
+
+
+def _shadows(earlier: Condition, later: Condition) -> bool:
+    """Return True if *earlier* matches every context *later* matches."""
+    return all(
+        _field_covers(name, getattr(earlier, name), getattr(later, name))
+        for name in _CONDITION_FIELDS
+    )
+
+
+class _ShadowIndex:
+    """Kept policies, bucketed so a new policy is only compared with the
+    earlier ones that could shadow it.
+
+    A policy is filed under the first field, most distinct patterns
+    first, whose patterns are all literals.  Such a field covers a later
+    one only if the later field is set and each of its non-empty
+    patterns is one of those literals, so only the smallest of their
+    buckets (or, if there is none, the whole field) needs checking.
+    Policies without a literal-only field are compared with everything.
+    """
+
+    __slots__ = ("by_field", "by_literal", "fields", "generic")
+
+    def __init__(self, policies: list[Policy]) -> None:
+        distinct = {
+            name: len({p for policy in policies for p in getattr(policy.condition, name) or ()})
+            for name in _CONDITION_FIELDS
+        }
+        self.fields = sorted(_CONDITION_FIELDS, key=distinct.__getitem__, reverse=True)
+        self.by_field: dict[str, list[Policy]] = {}
+        self.by_literal: dict[tuple[str, str], list[Policy]] = {}
+        self.generic: list[Policy] = []
+
+    def add(self, policy: Policy) -> None:
+        for name in self.fields:
+            patterns = getattr(policy.condition, name)
+            if patterns is not None and not any(has_magic(p) for p in patterns):
+                self.by_field.setdefault(name, []).append(policy)
+                for pattern in set(patterns):
+                    self.by_literal.setdefault((name, pattern), []).append(policy)
+                return
+        self.generic.append(policy)
+
+    def shadowed(self, cond: Condition) -> bool:
+        """Return True if a policy added earlier shadows *cond*."""
+        candidates = list(self.generic)
+        for name, policies in self.by_field.items():
+            patterns = getattr(cond, name)
+            if patterns is None:
+                continue
+            buckets = [self.by_literal.get((name, p), ()) for p in patterns if p]
+            candidates += min(buckets, key=len) if buckets else policies
+        return any(_shadows(earlier.condition, cond) for earlier in candidates)
+
+
+def _merge_field(a: Condition, b: Condition) -> str | None:
+    """Return the single list field in which *a* and *b* differ, if any."""
+    differing = [name for name in _CONDITION_FIELDS if getattr(a, name) != getattr(b, name)]
+    if len(differing) != 1:
+        return None
+    name = differing[0]
+    if getattr(a, name) is None or getattr(b, name) is None:
+        return None
+    return name
+
+
+def optimize_policies(policies: list[Policy]) -> list[Policy]:
+    """Shrink a priority-sorted list of enabled policies.
+
+    Three rewrites are applied, none of which changes the effect or
+    channel of any verdict:
+
+    - drop policies whose condition duplicates an earlier one;
+    - drop policies shadowed by an earlier one (every context they match
+      is already matched earlier, so they can never win);
+    - merge neighbouring policies with the same effect and channel whose
+      conditions differ in a single list field, by taking the union of
+      that field's patterns.
+
+    Verdicts for contexts that a dropped or merged policy would have
+    matched report the surviving policy's ``policy_id``.  The input
+    policies are not modified.
+    """
+    kept: list[Policy] = []
+    seen: set[tuple[tuple[str, ...] | None, ...]] = set()
+    index = _ShadowIndex(policies)
+    for policy in policies:
+        key = _condition_key(policy.condition)
+        if key in seen:
+            continue
+        if index.shadowed(policy.condition):
+            continue
+        seen.add(key)
+        kept.append(policy)
+        index.add(policy)
+
+    merged: list[Policy] = []
+    for policy in kept:
+        if merged:
+            prev = merged[-1]
+            if prev.effect == policy.effect and prev.channel == policy.channel:
+                name = _merge_field(prev.condition, policy.condition)
+                if name is not None:
+                    patterns = list(getattr(prev.condition, name))
+                    patterns += [p for p in getattr(policy.condition, name) if p not in patterns]
+                    condition = replace(prev.condition, **{name: patterns})
+                    merged[-1] = replace(prev, condition=condition)
+                    continue
+        merged.append(policy)
+    return merged
@@ -2,6 +2,10 @@
 
 from __future__ import annotations
 
+from pathlib import Path
+
+import pytest
+
 from agent_policy_guard import (
     Channel,
     Condition,
@@ -12,8 +16,10 @@ from agent_policy_guard import (
     Policy,
     PolicyEngine,
     PolicySet,
+    Verdict,
     load_policy_set_from_str,
 )
+from agent_policy_guard.index import PolicyIndex
 
 # ── Helper ───────────────────────────────────────────────────────────────
 
@@ -26,6 +32,24 @@ def _make_policy_set(*policies: Policy, default_effect: str = "ask") -> PolicySe
     )
 
 
+def _candidates(index: PolicyIndex, ctx: EvalContext, mode: str = "") -> list[int]:
+    """Return the positions set in ``index.candidate_mask(ctx, mode)``, ascending."""
+    mask = index.candidate_mask(ctx, mode)
+    return [pos for pos in range(mask.bit_length()) if mask >> pos & 1]
+
+
+@pytest.fixture(params=["extension", "python"])
+def matcher_backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Run a test with the C extension's matchers, then the generated Python ones."""
+    from agent_policy_guard import engine
+
+    if request.param == "extension" and engine.CompiledCondition is None:
+        pytest.skip("C extension not built")
+    if request.param == "python":
+        monkeypatch.setattr(engine, "CompiledCondition", None)
+    return request.param
+
+
 # ── Engine tests ─────────────────────────────────────────────────────────
 
 
@@ -91,6 +115,31 @@ class TestPriorityOrdering:
         verdict = engine.evaluate(EvalContext(tool="anything"))
         assert verdict.policy_id == "low"
 
+    def test_equal_priorities_keep_file_order(self) -> None:
+        ps = _make_policy_set(
+            Policy(id="b", effect=Effect.deny, priority=5, condition=Condition(tools=["*"])),
+            Policy(id="a", effect=Effect.allow, priority=5, condition=Condition(tools=["*"])),
+            Policy(id="c", effect=Effect.allow, priority=1, condition=Condition(tools=["x"])),
+        )
+        engine = PolicyEngine(ps)
+        assert [p.id for p in engine.policies] == ["c", "b", "a"]
+        assert engine.evaluate(EvalContext(tool="anything")).policy_id == "b"
+        ps.policies.pop()
+        engine.load(ps)
+        assert [p.id for p in engine.policies] == ["b", "a"]
+
+    def test_enabled_policies_are_sorted_once_on_load(self) -> None:
+        ps = _make_policy_set(
+            Policy(id="late", effect=Effect.deny, priority=9, condition=Condition(tools=["*"])),
+            Policy(id="off", effect=Effect.deny, priority=0, enabled=False),
+            Policy(id="early", effect=Effect.allow, priority=1, condition=Condition(tools=["x"])),
+        )
+        engine = PolicyEngine(ps)
+        assert isinstance(engine._loaded.enabled_policies, tuple)
+        assert [p.id for p in engine._loaded.enabled_policies] == ["early", "late"]
+        ps.policies.reverse()  # the engine keeps its own snapshot
+        assert engine.evaluate(EvalContext(tool="x")).policy_id == "early"
+
 
 class TestConditionMatching:
     def test_mode_match(self) -> None:
@@ -244,6 +293,455 @@ class TestEvaluateAll:
         assert len(matched) == 1
         assert matched[0]["policy_id"] == "p1"
 
+    def test_columnar_matches_dict_results(self) -> None:
+        from agent_policy_guard import PolicyMatches
+
+        ps = _make_policy_set(
+            Policy(id="p1", effect=Effect.allow, priority=2, condition=Condition(tools=["bash"])),
+            Policy(id="p2", effect=Effect.deny, priority=1, condition=Condition(tools=["*"])),
+            Policy(id="off", effect=Effect.deny, enabled=False),
+        )
+        eng = PolicyEngine(ps)
+        ctx = EvalContext(tool="bash")
+        columns = eng.evaluate_all_columnar(ctx)
+        assert isinstance(columns, PolicyMatches)
+        assert columns.policy_ids == ("p2", "p1", "off")
+        assert columns.effects == (Effect.deny, Effect.allow, Effect.deny)
+        assert columns.enabled == (True, True, False)
+        assert list(columns.matched) == [r["matched"] for r in eng.evaluate_all(ctx)]
+        assert columns.matched == (True, True, False)
+        assert eng.evaluate_all_columnar(EvalContext(tool="grep")).names is columns.names
+        assert columns == eng.evaluate_all_columnar(ctx)
+        assert hash(columns) == hash(eng.evaluate_all_columnar(ctx))
+
+    def test_columnar_as_numpy(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        from agent_policy_guard import engine
+
+        eng = PolicyEngine(
+            _make_policy_set(
+                Policy(id="p1", effect=Effect.deny, condition=Condition(tools=["bash"])),
+                Policy(id="p2", effect=Effect.deny, condition=Condition(tools=["grep"])),
+            )
+        )
+        if engine._numpy() is not None:
+            matched = eng.evaluate_all_columnar(EvalContext(tool="bash"), as_numpy=True).matched
+            assert matched.dtype == bool and int(matched.sum()) == 1
+        monkeypatch.setattr(engine, "_numpy", lambda: None)
+        with pytest.raises(ImportError, match="NumPy"):
+            eng.evaluate_all_columnar(EvalContext(tool="bash"), as_numpy=True)
+
+
+class TestVerdictCache:
+    def test_repeated_context_returns_cached_verdict(self) -> None:
+        ps = _make_policy_set(
+            Policy(id="p1", effect=Effect.deny, condition=Condition(tools=["bash"])),
+        )
+        engine = PolicyEngine(ps)
+        first = engine.evaluate(EvalContext(tool="bash", mode="interactive"))
+        assert engine.evaluate(EvalContext(tool="bash", mode="interactive")) is first
+
+    def test_load_invalidates_cache(self) -> None:
+        engine = PolicyEngine(
+            _make_policy_set(Policy(id="p1", effect=Effect.deny, condition=Condition(tools=["*"])))
+        )
+        assert engine.evaluate(EvalContext(tool="bash")).effect == Effect.deny
+        engine.load(_make_policy_set(default_effect="allow"))
+        assert engine.evaluate(EvalContext(tool="bash")).effect == Effect.allow
+
+    def test_cache_is_bounded(self) -> None:
+        engine = PolicyEngine(_make_policy_set(), cache_size=2)
+        for tool in ("a", "b", "c"):
+            engine.evaluate(EvalContext(tool=tool))
+        assert list(engine._loaded.cache) == [EvalContext(tool="b"), EvalContext(tool="c")]
+
+    def test_cache_evicts_least_recently_used(self) -> None:
+        engine = PolicyEngine(_make_policy_set(), cache_size=2)
+        engine.evaluate(EvalContext(tool="a"))
+        engine.evaluate(EvalContext(tool="b"))
+        engine.evaluate(EvalContext(tool="a"))
+        engine.evaluate(EvalContext(tool="c"))
+        assert list(engine._loaded.cache) == [EvalContext(tool="a"), EvalContext(tool="c")]
+
+    def test_cache_can_be_disabled(self) -> None:
+        engine = PolicyEngine(_make_policy_set(), cache_size=0)
+        engine.evaluate(EvalContext(tool="bash"))
+        assert not engine._loaded.cache
+
+    def test_concurrent_evaluation_and_reload(self) -> None:
+        import threading
+
+        sets = [
+            _make_policy_set(
+                *(
+                    Policy(id=f"{tag}{i}", effect=effect, condition=Condition(tools=[f"t{i}"]))
+                    for i in order
+                )
+            )
+            # Different positions per set, so mixing their state would show.
+            for tag, effect, order in (
+                ("a", Effect.allow, range(20)),
+                ("d", Effect.deny, range(19, -1, -1)),
+            )
+        ]
+        engine = PolicyEngine(sets[0], cache_size=4)
+        errors: list[BaseException] = []
+        stop = threading.Event()
+
+        def evaluate() -> None:
+            try:
+                while not stop.is_set():
+                    for i in range(20):
+                        verdict = engine.evaluate(EvalContext(tool=f"t{i}"))
+                        # Never a mix of both sets: the id and effect agree.
+                        expected = Effect.allow if verdict.policy_id[0] == "a" else Effect.deny
+                        assert verdict.policy_id[1:] == str(i)
+                        assert verdict.effect == expected
+            except BaseException as exc:
+                errors.append(exc)
+
+        workers = [threading.Thread(target=evaluate) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for n in range(500):
+            engine.load(sets[n % 2])
+        stop.set()
+        for worker in workers:
+            worker.join()
+        assert not errors
+        assert len(engine._loaded.cache) <= 4
+
+    def test_verdicts_are_shared_between_calls(self) -> None:
+        engine = PolicyEngine(
+            _make_policy_set(Policy(id="p1", effect=Effect.deny, condition=Condition(tools=["x"]))),
+            cache_size=0,
+        )
+        first, second = (engine.evaluate(EvalContext(tool=t)) for t in ("x", "x"))
+        assert first is second and first.policy_id == "p1"
+        assert engine.evaluate(EvalContext(tool="a")) is engine.evaluate(EvalContext(tool="b"))
+
+
+class TestBatchEvaluate:
+    def test_matches_scalar_evaluate(self) -> None:
+        ps = PolicySet(
+            metadata=Metadata(name="test"),
+            defaults=Defaults(effect=Effect.hitl),
+            policies=[
+                Policy(id="glob", effect=Effect.ask, priority=1, condition=Condition(tools=["m*"])),
+                Policy(
+                    id="bg",
+                    effect=Effect.deny,
+                    priority=2,
+                    condition=Condition(modes=["background"], tools=["bash", "run"]),
+                ),
+                Policy(
+                    id="mcp",
+                    effect=Effect.aitl,
+                    priority=3,
+                    condition=Condition(mcp_servers=["azure"]),
+                ),
+                Policy(
+                    id="low", effect=Effect.allow, priority=4, condition=Condition(risk=["low"])
+                ),
+            ],
+            context_fallbacks={"scheduler": "background"},
+        )
+        contexts = [
+            EvalContext(tool="make", mode="background"),
+            EvalContext(tool="bash", mode="background"),
+            EvalContext(tool="bash", mode="scheduler"),
+            EvalContext(tool="deploy", mcp_server="azure"),
+            EvalContext(tool="deploy"),
+            EvalContext(tool="view", risk="low"),
+            EvalContext(tool="view", risk="high"),
+        ]
+        expected = [PolicyEngine(ps).evaluate(ctx) for ctx in contexts]
+        assert PolicyEngine(ps).batch_evaluate(contexts) == expected
+        assert PolicyEngine(ps).batch_evaluate([]) == []
+        assert PolicyEngine(ps, cache_size=0).batch_evaluate(contexts * 2) == expected * 2
+
+
+class TestOptimize:
+    def test_duplicates_and_shadowed_policies_are_dropped(self) -> None:
+        from agent_policy_guard.optimize import optimize_policies
+
+        policies = [
+            Policy(id="a", effect=Effect.deny, condition=Condition(tools=["bash", "run*"])),
+            Policy(id="dup", effect=Effect.allow, condition=Condition(tools=["bash", "run*"])),
+            Policy(
+                id="shadowed",
+                effect=Effect.allow,
+                condition=Condition(tools=["runner"], modes=["background"]),
+            ),
+            Policy(id="live", effect=Effect.allow, condition=Condition(tools=["grep"])),
+        ]
+        assert [p.id for p in optimize_policies(policies)] == ["a", "live"]
+
+    def test_shadowing_is_found_across_literal_buckets(self) -> None:
+        from agent_policy_guard.optimize import optimize_policies
+
+        policies = [
+            Policy(id="bash", effect=Effect.deny, condition=Condition(tools=["bash", "sh"])),
+            Policy(id="bg", effect=Effect.deny, condition=Condition(modes=["background"])),
+            Policy(id="sh", effect=Effect.allow, condition=Condition(tools=["sh"], risk=["low"])),
+            Policy(
+                id="bg-grep",
+                effect=Effect.allow,
+                condition=Condition(tools=["grep"], modes=["background"]),
+            ),
+            Policy(id="unset", effect=Effect.allow, condition=Condition(tools=[""], modes=["x"])),
+            Policy(id="grep", effect=Effect.allow, condition=Condition(tools=["grep"])),
+        ]
+        assert [p.id for p in optimize_policies(policies)] == ["bash", "bg", "grep"]
+
+    def test_unset_mcp_server_is_not_shadowed_by_star(self) -> None:
+        from agent_policy_guard.optimize import optimize_policies
+
+        policies = [
+            Policy(id="mcp", effect=Effect.deny, condition=Condition(mcp_servers=["*"])),
+            Policy(id="all", effect=Effect.allow),
+        ]
+        assert [p.id for p in optimize_policies(policies)] == ["mcp", "all"]
+
+    def test_neighbouring_policies_are_merged(self) -> None:
+        from agent_policy_guard.optimize import optimize_policies
+
+        first = Policy(id="a", effect=Effect.allow, condition=Condition(tools=["view"]))
+        policies = [
+            first,
+            Policy(id="b", effect=Effect.allow, condition=Condition(tools=["grep", "view"])),
+            Policy(id="c", effect=Effect.deny, condition=Condition(tools=["bash"])),
+        ]
+        optimized = optimize_policies(policies)
+        assert [p.id for p in optimized] == ["a", "c"]
+        assert optimized[0].condition.tools == ["view", "grep"]
+        assert first.condition.tools == ["view"]
+
+    def test_engine_optimize_keeps_effects(self) -> None:
+        ps = _make_policy_set(
+            Policy(id="a", effect=Effect.allow, priority=1, condition=Condition(tools=["view"])),
+            Policy(id="b", effect=Effect.allow, priority=2, condition=Condition(tools=["grep"])),
+            Policy(id="c", effect=Effect.deny, priority=3, condition=Condition(tools=["view"])),
+            default_effect="hitl",
+        )
+        engine = PolicyEngine(ps, optimize=True)
+        assert engine.resolve(EvalContext(tool="grep")) == "allow"
+        assert engine.resolve(EvalContext(tool="view")) == "allow"
+        assert engine.resolve(EvalContext(tool="bash")) == "hitl"
+        assert len(engine.policies) == 3
+        assert len(engine.evaluate_all(EvalContext(tool="view"))) == 3
+
+
+class TestPolicyIndex:
+    def test_literal_tools_narrow_candidates(self) -> None:
+        policies = [
+            Policy(id="bash", effect=Effect.deny, condition=Condition(tools=["bash"])),
+            Policy(id="grep", effect=Effect.allow, condition=Condition(tools=["grep", "view"])),
+            Policy(id="mcp", effect=Effect.ask, condition=Condition(tools=["mcp:*"])),
+            Policy(id="any", effect=Effect.hitl, condition=Condition(risk=["high"])),
+        ]
+        index = PolicyIndex(policies)
+        assert _candidates(index, EvalContext(tool="view", risk="high")) == [1, 3]
+        assert _candidates(index, EvalContext(tool="unknown", risk="high")) == [3]
+        assert _candidates(index, EvalContext(tool="mcp:fs", risk="high")) == [2, 3]
+
+    def test_fields_are_intersected(self) -> None:
+        policies = [
+            Policy(id="p0", effect=Effect.deny, condition=Condition(tools=["bash"])),
+            Policy(id="p1", effect=Effect.deny, condition=Condition(modes=["background"])),
+        ]
+        index = PolicyIndex(policies)
+        assert _candidates(index, EvalContext(tool="grep"), "interactive") == []
+        assert _candidates(index, EvalContext(tool="bash"), "background") == [0, 1]
+
+    def test_risk_and_channels_narrow_candidates(self) -> None:
+        policies = [
+            Policy(id="p0", effect=Effect.deny, condition=Condition(risk=["high", "critical"])),
+            Policy(id="p1", effect=Effect.deny, condition=Condition(channels=["slack"])),
+            Policy(id="p2", effect=Effect.deny, condition=Condition(risk=["low"])),
+        ]
+        index = PolicyIndex(policies)
+        assert _candidates(index, EvalContext(risk="critical")) == [0]
+        assert _candidates(index, EvalContext(risk="low", channel="slack")) == [1, 2]
+        assert _candidates(index, EvalContext(risk="medium")) == []
+
+    def test_unset_value_only_matches_globs_matching_empty(self) -> None:
+        policies = [
+            Policy(id="p0", effect=Effect.deny, condition=Condition(tools=["b*"])),
+            Policy(id="p1", effect=Effect.deny, condition=Condition(tools=["**"])),
+            Policy(id="p2", effect=Effect.deny, condition=Condition(tools=["bash"])),
+            Policy(id="p3", effect=Effect.deny, condition=Condition(risk=["high"])),
+        ]
+        index = PolicyIndex(policies)
+        assert _candidates(index, EvalContext(risk="high")) == [1, 3]
+        assert _candidates(index, EvalContext(tool="bash", risk="high")) == [0, 1, 2, 3]
+
+    def test_candidates_beyond_one_machine_word(self) -> None:
+        policies = [
+            Policy(id=f"p{i}", effect=Effect.deny, condition=Condition(tools=[f"t{i % 3}"]))
+            for i in range(200)
+        ]
+        index = PolicyIndex(policies)
+        assert _candidates(index, EvalContext(tool="t2")) == list(range(2, 200, 3))
+
+    @pytest.mark.parametrize("backend", ["python", "hyperscan", "re2"])
+    def test_glob_set_agrees_with_glob_match(
+        self, backend: str, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        from agent_policy_guard import globset
+        from agent_policy_guard.match import glob_match
+
+        if backend != "python" and getattr(globset, backend) is None:
+            pytest.skip(f"{backend} not installed")
+        if backend == "hyperscan":
+            monkeypatch.setattr(globset, "re2", None)
+        patterns = ["mcp:*", "*.sh", "a?c", "[ab]*", "x-y*", "*.*", "é*", "a\\b*", "mcp:*"]
+        values = ["mcp:fs", "run.sh", "abc", "bcd", "x-y\n", "é", "a\\bz", "", "\ud800x"]
+        entries = [(pattern, bit) for bit, pattern in enumerate(patterns)]
+        glob_set = globset.GlobSet(entries, min_patterns=1 if backend != "python" else 100)
+        assert len(glob_set) == len(patterns) - 1
+        assert (glob_set._scan is not None) is (backend != "python")
+        for value in values:
+            expected = sum(1 << bit for pattern, bit in entries if glob_match(pattern, value))
+            assert glob_set.matching(value) == expected, value
+
+    def test_most_varied_field_is_checked_first(self) -> None:
+        from agent_policy_guard.engine import _field_order
+
+        policies = [
+            Policy(id="p0", effect=Effect.deny, condition=Condition(users=["a"], tools=["x"])),
+            Policy(id="p1", effect=Effect.deny, condition=Condition(users=["b"], tools=["x"])),
+            Policy(id="p2", effect=Effect.deny, condition=Condition(users=["c"])),
+        ]
+        order = [cond_attr for cond_attr, _ in _field_order(policies)]
+        assert order[:2] == ["users", "tools"]
+
+    def test_compiled_matcher_agrees_with_condition(self, matcher_backend: str) -> None:
+        from agent_policy_guard.engine import (
+            _FIELD_PAIRS,
+            _compile_condition,
+            _compile_matcher,
+            _condition_matches,
+        )
+
+        conditions = [
+            Condition(),
+            Condition(tools=["bash", "mcp:*"], modes=["background"]),
+            Condition(mcp_servers=["*"]),
+            Condition(mcp_servers=["azure-*"], risk=["high", "critical"]),
+            Condition(users=[], sessions=["s-?"]),
+            Condition(tools=["*.sh", "[bg]*"], models=["", "gpt-4"]),
+            Condition(models=["**", "gpt-*"]),
+            Condition(sessions=["s*"], mcp_servers=["**"]),
+        ]
+        contexts = [
+            EvalContext(),
+            EvalContext(tool="bash", mode="background", risk="high"),
+            EvalContext(tool="run.sh", model="gpt-4"),
+            EvalContext(tool="mcp:x", mode="background", mcp_server="azure-1", risk="critical"),
+            EvalContext(mcp_server="github", session="s-1"),
+        ]
+        for cond in conditions:
+            compiled = _compile_condition(cond)
+            matcher = _compile_matcher(
+                Policy(id="p", effect=Effect.deny, condition=cond),
+                compiled,
+                list(_FIELD_PAIRS),
+            )
+            for ctx in contexts:
+                assert matcher(ctx, ctx.mode) is _condition_matches(compiled, ctx), (cond, ctx)
+
+    def test_str_subclass_context_values(self, matcher_backend: str) -> None:
+        from enum import Enum
+
+        class Mode(str, Enum):
+            bg = "background"
+
+        class Name(str):
+            pass
+
+        ps = _make_policy_set(
+            Policy(
+                id="p1",
+                effect=Effect.deny,
+                condition=Condition(
+                    channels=["phone"], modes=["background"], tools=["ba*", "*sh", "b?sh"]
+                ),
+            ),
+            Policy(id="p2", effect=Effect.allow, condition=Condition(tools=["view"])),
+        )
+        eng = PolicyEngine(ps, cache_size=0)
+        ctx = EvalContext(channel=Channel.phone, mode=Mode.bg, tool=Name("bash"))
+        assert eng.evaluate(ctx).policy_id == "p1"
+        assert eng.evaluate(EvalContext(tool=Name("view"))).policy_id == "p2"
+        assert eng.evaluate(EvalContext(channel=Channel.chat, tool=Name("bash"))).policy_id is None
+
+    def test_edited_pattern_lists_are_seen_on_load(self, matcher_backend: str) -> None:
+        ps = load_policy_set_from_str(
+            "defaults: {effect: allow}\n"
+            "policies:\n  - {id: p1, effect: deny, condition: {tools: [bash]}}\n"
+        )
+        ps.policies[0].condition.tools.append("sh")
+        eng = PolicyEngine(ps)
+        ctx = EvalContext(tool="sh")
+        assert eng.resolve(ctx) == "deny"
+        assert eng.evaluate_all(ctx)[0]["matched"] is True
+        # Later edits are not seen until the next load(), by any path.
+        ps.policies[0].condition.tools.append("zsh")
+        ctx = EvalContext(tool="zsh")
+        assert eng.resolve(ctx) == "allow"
+        assert eng.evaluate_all(ctx)[0]["matched"] is False
+        eng.load(ps)
+        assert eng.resolve(ctx) == "deny"
+        assert eng.evaluate_all(ctx)[0]["matched"] is True
+
+    def test_same_shape_conditions_share_generated_code(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        from agent_policy_guard import engine
+        from agent_policy_guard.engine import (
+            _FIELD_PAIRS,
+            _compile_condition,
+            _compile_matcher,
+        )
+
+        monkeypatch.setattr(engine, "CompiledCondition", None)
+        first, second = (
+            _compile_matcher(
+                Policy(id=pid, effect=Effect.deny, condition=Condition(tools=[tool])),
+                _compile_condition(Condition(tools=[tool])),
+                list(_FIELD_PAIRS),
+            )
+            for pid, tool in (("p1", "bash"), ("p2", "grep"))
+        )
+        assert first.__code__.co_code == second.__code__.co_code
+        assert second.__code__.co_filename == "<policy p2>"
+        assert second(EvalContext(tool="grep"), "") and not second(EvalContext(tool="bash"), "")
+
+    def test_scan_across_many_candidates(self, matcher_backend: str) -> None:
+        # Every policy is a tool candidate; risk decides, past the first bytes of the mask.
+        policies = [
+            Policy(id=f"p{i}", effect=Effect.deny, priority=i, condition=Condition(risk=[f"r{i}"]))
+            for i in range(20)
+        ]
+        ps = _make_policy_set(*policies, default_effect="allow")
+        eng = PolicyEngine(ps, cache_size=0)
+        for i in (0, 7, 8, 19):
+            assert eng.evaluate(EvalContext(risk=f"r{i}")).policy_id == f"p{i}"
+        assert eng.evaluate(EvalContext(risk="r20")).policy_id is None
+        verdicts = eng.batch_evaluate([EvalContext(risk=f"r{i}") for i in range(21)])
+        assert [v.policy_id for v in verdicts] == [f"p{i}" for i in range(20)] + [None]
+
+    def test_index_preserves_priority_order(self) -> None:
+        ps = _make_policy_set(
+            Policy(id="glob", effect=Effect.ask, priority=5, condition=Condition(tools=["b*"])),
+            Policy(id="exact", effect=Effect.deny, priority=1, condition=Condition(tools=["bash"])),
+            default_effect="allow",
+        )
+        engine = PolicyEngine(ps)
+        assert engine.evaluate(EvalContext(tool="bash")).policy_id == "exact"
+        assert engine.evaluate(EvalContext(tool="bun")).policy_id == "glob"
+        assert engine.evaluate(EvalContext(tool="grep")).policy_id is None
+
 
 # ── Custom effects ───────────────────────────────────────────────────────
 
@@ -321,6 +819,30 @@ policies:
 
 
 class TestContextFallbacks:
+    def test_chain_looks_up_context_fields_once(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        ps = _make_policy_set(
+            *(
+                Policy(
+                    id=mode,
+                    effect=Effect.deny,
+                    condition=Condition(modes=[mode], tools=[f"{mode}*"]),
+                )
+                for mode in ("a", "b", "c")
+            )
+        )
+        ps.context_fallbacks = {"a": "b", "b": "c"}
+        engine = PolicyEngine(ps, cache_size=0)
+        lookups: list[EvalContext] = []
+        context_mask = PolicyIndex.context_mask
+        monkeypatch.setattr(
+            PolicyIndex,
+            "context_mask",
+            lambda self, ctx: lookups.append(ctx) or context_mask(self, ctx),
+        )
+        assert engine.evaluate(EvalContext(tool="c1", mode="a")).policy_id == "c"
+        # Once for the context's own mode, once for the whole chain.
+        assert len(lookups) == 2
+
     def test_fallback_to_background(self) -> None:
         ps = PolicySet(
             metadata=Metadata(name="test"),
@@ -380,6 +902,44 @@ class TestContextFallbacks:
         v = engine.evaluate(EvalContext(tool="bash", mode="a"))
         assert v.effect == Effect.deny
 
+    def test_unreachable_modes_short_circuit(self) -> None:
+        ps = PolicySet(
+            metadata=Metadata(name="test"),
+            defaults=Defaults(effect=Effect("allow")),
+            policies=[
+                Policy(id="bg", effect=Effect.deny, condition=Condition(modes=["background"])),
+            ],
+            context_fallbacks={"scheduler": "bot", "bot": "background", "a": "b", "b": "a"},
+        )
+        engine = PolicyEngine(ps)
+        assert not engine._loaded.modes_unreachable("scheduler")
+        assert engine._loaded.modes_unreachable("interactive")
+        assert engine._loaded.modes_unreachable("a")
+        assert engine.evaluate(EvalContext(mode="scheduler")).policy_id == "bg"
+        assert engine.evaluate(EvalContext(mode="a")).effect == Effect.allow
+
+        ps.policies.append(Policy(id="any", effect=Effect.hitl))
+        engine.load(ps)
+        assert not engine._loaded.modes_unreachable("interactive")
+
+    def test_fallback_chains_are_flattened(self) -> None:
+        from agent_policy_guard.engine import _flatten_fallbacks
+
+        chains = _flatten_fallbacks({"scheduler": "bot", "bot": "background", "a": "b", "b": "a"})
+        assert chains["scheduler"] == ("bot", "background")
+        assert chains["bot"] == ("background",)
+        assert chains["a"] == ("b",)
+        assert chains["b"] == ("a",)
+
+    def test_fallback_chains_skip_modes_no_policy_matches(self) -> None:
+        from agent_policy_guard.engine import _flatten_fallbacks
+
+        fallbacks = {"scheduler": "bot", "bot": "background", "a": "b", "b": "a"}
+        chains = _flatten_fallbacks(fallbacks, frozenset({"background", "a"}))
+        assert chains["scheduler"] == ("background",)
+        assert chains["a"] == ()
+        assert chains["b"] == ("a",)
+
     def test_fallback_loaded_from_yaml(self) -> None:
         yaml_doc = """\
 apiVersion: agent-policy/v1
@@ -417,6 +977,69 @@ policies:
         assert engine.context_fallbacks == {"a": "b"}
 
 
+# ── Models ──────────────────────────────────────────────────────────────
+
+
+class TestModels:
+    def test_hot_types_use_slots(self) -> None:
+        policy = Policy(id="p1", effect=Effect.allow, condition=Condition(tools=["bash"]))
+        instances = [EvalContext(tool="bash"), policy, policy.condition, Verdict(Effect.allow)]
+        for obj in instances:
+            assert not hasattr(obj, "__dict__"), type(obj).__name__
+
+    def test_hot_types_are_frozen(self) -> None:
+        import dataclasses
+
+        policy = Policy(id="p1", effect=Effect.allow, condition=Condition(tools=["bash"]))
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            policy.enabled = False  # type: ignore[misc]
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            policy.condition.tools = ["grep"]  # type: ignore[misc]
+        changed = dataclasses.replace(policy.condition, tools=["grep"])
+        assert changed.tools == ["grep"] and changed.risk is None
+
+    def test_context_hash_is_cached_and_consistent(self) -> None:
+        a = EvalContext(tool="bash", mode="background")
+        b = EvalContext(tool="bash", mode="background")
+        assert a == b and hash(a) == hash(b)
+        assert a._hash == hash(a)
+        assert EvalContext(tool="bash") != a
+        assert {a: 1}[b] == 1
+
+    def test_pickled_context_recomputes_hash(self) -> None:
+        import pickle
+
+        ctx = EvalContext(tool="bash", user="u1")
+        restored = pickle.loads(pickle.dumps(ctx))
+        assert restored == ctx and hash(restored) == hash(ctx)
+
+    def test_condition_fields_map_to_context_attributes(self) -> None:
+        import dataclasses
+
+        from agent_policy_guard.models import _CONDITION_FIELDS, _CONTEXT_ATTRS
+
+        assert _CONDITION_FIELDS == tuple(f.name for f in dataclasses.fields(Condition))
+        assert set(_CONTEXT_ATTRS.values()) == {f.name for f in dataclasses.fields(EvalContext)}
+
+    def test_condition_checks_cheap_fields_first(self) -> None:
+        from agent_policy_guard.engine import _compile_condition
+
+        cond = Condition(tools=["mcp:*"], modes=["background"], risk=["high"], users=[])
+        assert list(_compile_condition(cond)) == ["users", "modes", "risk", "tools"]
+
+    def test_derived_state_is_not_a_dataclass_field(self) -> None:
+        import dataclasses
+        import json
+
+        ctx = EvalContext(tool="bash")
+        hash(ctx)
+        assert "_hash" not in dataclasses.asdict(ctx)
+        policy = Policy(id="p1", effect=Effect.deny, condition=Condition(tools=["mcp:*"]))
+        assert json.loads(json.dumps(dataclasses.asdict(policy)))["condition"]["tools"] == [
+            "mcp:*"
+        ]
+
+
 # ── Loader tests ─────────────────────────────────────────────────────────
 
 
@@ -480,6 +1103,57 @@ policies:
         assert p0.condition.tools == ["view", "grep", "glob"]
         assert p0.enabled is True
 
+    def test_loaded_patterns_are_interned(self) -> None:
+        import sys
+
+        ps = load_policy_set_from_str(self.YAML_DOC)
+        assert ps.policies[1].condition.modes == ["interactive"]
+        assert ps.policies[1].condition.modes[0] is sys.intern("interactive")
+
+    def test_json_document_matches_yaml(self) -> None:
+        import json
+
+        import yaml
+
+        expected = load_policy_set_from_str(self.YAML_DOC)
+        text = json.dumps(yaml.safe_load(self.YAML_DOC))
+        assert load_policy_set_from_str(text) == expected
+        assert load_policy_set_from_str(text.encode("utf-16")) == expected
+        # A flow mapping is YAML but not JSON.
+        flow = "{kind: PolicySet, defaults: {effect: allow}}"
+        assert load_policy_set_from_str(flow).defaults.effect == Effect.allow
+
+    def test_load_from_file_is_cached_until_it_changes(self, tmp_path: Path) -> None:
+        import os
+
+        from agent_policy_guard import load_policy_set
+
+        path = tmp_path / "policies.yaml"
+        path.write_text(self.YAML_DOC)
+        first = load_policy_set(path)
+        first.policies.clear()  # callers get copies, not the cached instance
+        second = load_policy_set(path)
+        assert len(second.policies) == 3
+        second.policies[0].condition.tools.append("bash")  # pattern lists are copied too
+        third = load_policy_set(path)
+        assert third.policies[0].condition.tools == ["view", "grep", "glob"]
+
+        path.write_text(self.YAML_DOC.replace("name: test-set", "name: changed"))
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert load_policy_set(path).metadata.name == "changed"
+        assert load_policy_set(path, cache=False) == load_policy_set(path)
+
+    def test_non_string_patterns_are_rejected(self) -> None:
+        doc = "policies:\n  - id: p1\n    effect: deny\n    condition:\n      tools: {}\n"
+        with pytest.raises(ValueError, match=r"condition\.tools patterns must be strings, got 123"):
+            load_policy_set_from_str(doc.format("[123]"))
+        with pytest.raises(ValueError, match=r"condition\.tools must be a list"):
+            load_policy_set_from_str(doc.format("bash"))
+        assert load_policy_set_from_str(doc.format("['123']")).policies[0].condition.tools == [
+            "123"
+        ]
+
     def test_disabled_policy_parsed(self) -> None:
         ps = load_policy_set_from_str(self.YAML_DOC)
         p2 = ps.policies[2]
@@ -508,6 +1182,27 @@ policies:
         v = engine.evaluate(EvalContext(tool="unknown"))
         assert v.effect == Effect.deny
 
+    def test_load_from_bytes(self) -> None:
+        ps = load_policy_set_from_str(self.YAML_DOC.encode("utf-8"))
+        assert ps.metadata.name == "test-set"
+        assert len(ps.policies) == 3
+
+    def test_repeated_effects_resolve_to_same_member(self) -> None:
+        doc = """\
+apiVersion: agent-policy/v1
+kind: PolicySet
+metadata:
+  name: x
+policies:
+  - {id: a, effect: my-org-mfa}
+  - {id: b, effect: my-org-mfa, channel: phone}
+  - {id: c, effect: deny, channel: phone}
+"""
+        ps = load_policy_set_from_str(doc)
+        assert ps.policies[0].effect is ps.policies[1].effect
+        assert ps.policies[1].channel is ps.policies[2].channel is Channel.phone
+        assert ps.policies[2].effect is Effect.deny
+
     def test_invalid_kind_raises(self) -> None:
         bad = "apiVersion: agent-policy/v1\nkind: NotAPolicy\nmetadata:\n  name: x\npolicies: []"
         try:
@@ -540,6 +1235,20 @@ class TestGlobMatch:
         assert glob_match("*-server", "github-mcp-server") is True
         assert glob_match("*-server", "github-mcp-client") is False
 
+    def test_agrees_with_fnmatchcase(self) -> None:
+        import fnmatch
+
+        from agent_policy_guard.match import compile_pattern, glob_match
+
+        patterns = ["bash", "mcp:*", "*.sh", "a*b*", "[ab]*", "*[!x]", "a?c*", "*a*", "**"]
+        values = ["", "bash", "mcp:", "mcp:fs", "run.sh", "a.sh", "aXbY", "bx", "abcd", "x"]
+        for pattern in patterns:
+            matcher = compile_pattern(pattern)
+            for value in values:
+                expected = fnmatch.fnmatchcase(value, pattern)
+                assert glob_match(pattern, value) is expected, (pattern, value)
+                assert matcher(value) is expected, (pattern, value)
+
     def test_empty_pattern(self) -> None:
         from agent_policy_guard.match import glob_match
         assert glob_match("", "anything") is False
@@ -549,6 +1258,39 @@ class TestGlobMatch:
         assert glob_match("gpt-?", "gpt-5") is True
         assert glob_match("gpt-?", "gpt-55") is False
 
+    def test_compiled_pattern_agrees_with_glob_match(self) -> None:
+        from agent_policy_guard.match import compile_pattern, glob_match
+
+        patterns = ["", "*", "bash", "mcp:*", "*-server", "gpt-?", "a*b*c", "[ab]*", "[!a]x"]
+        values = ["", "bash", "mcp:github", "github-mcp-server", "gpt-5", "abc", "axbyc", "bx"]
+        for pattern in patterns:
+            matcher = compile_pattern(pattern)
+            for value in values:
+                assert matcher(value) is glob_match(pattern, value), (pattern, value)
+
+    def test_compile_patterns_splits_literals_and_globs(self) -> None:
+        from agent_policy_guard.match import compile_patterns
+
+        compiled = compile_patterns(["bash", "view", "mcp:*", ""])
+        assert compiled is not None
+        assert compiled.literals == frozenset({"bash", "view"})
+        assert len(compiled.globs) == 1
+        assert compiled("view") and compiled("mcp:github")
+        assert not compiled("grep") and not compiled("")
+        assert compile_patterns(["x", "*"]).match_all
+        assert compile_patterns(None) is None
+
+    def test_several_globs_share_one_regex(self) -> None:
+        from agent_policy_guard.match import compile_patterns, glob_match
+
+        patterns = ["mcp:*", "*-server", "gpt-?", "[ab]*", "x"]
+        compiled = compile_patterns(patterns)
+        assert compiled is not None
+        assert len(compiled.globs) == 1
+        for value in ["mcp:x", "a-server", "gpt-5", "gpt-55", "bz", "x", "y", "", "mcp\n"]:
+            expected = any(glob_match(p, value) for p in patterns)
+            assert compiled(value) is expected, value
+
 
 class TestLoadExampleFiles:
     """Verify that all example YAML files load and evaluate correctly."""